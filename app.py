@@ -1,208 +1,374 @@
 # Streamlit 기반 물티슈 원가계산 웹 앱
+# reportlab, gspread, google-auth 는 무거워서 해당 기능을 처음 쓸 때 불러옴 (차트는 브라우저에서 Vega-Lite 로 그림)
+# (콜드 스타트 측정: python benchmarks/startup.py)
 import streamlit as st
-import matplotlib.pyplot as plt
 import pandas as pd
-from io import BytesIO
+import numpy as np
+import hashlib
 import os
-import csv
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
 import datetime
-import gspread
-from google.oauth2.service_account import Credentials
-
-# 한글 깨짐 방지용 폰트 설정
-import matplotlib
-matplotlib.rcParams['font.family'] = ['Malgun Gothic', 'AppleGothic', 'NanumGothic', 'DejaVu Sans']
-
-def calculate_wetwipe_cost(width_mm, height_mm, gsm, exchange_rate, percent_applied, quantity_per_unit, margin_rate=0.10,
-                             labor_cost=23.42, insurance_cost=4.17, management_cost=21.26, interest_cost=17.01, storage_cost=5.00, logistics_cost=28.57, usd_price_per_kg=1.46,
-                             submaterials=None, processing_costs=None, other_costs=None, corporate_profit=100):
-    area_m2 = (width_mm / 1000) * (height_mm / 1000)
-    applied_usd_price = usd_price_per_kg * (1 + percent_applied / 100)  # 백분율을 소수로 변환
-    unit_price_per_g = applied_usd_price * exchange_rate / 1000
-    gsm_price = unit_price_per_g * gsm
-    loss_rate_fabric = 0.05
-    applied_unit_price = gsm_price * (1 + loss_rate_fabric)
-    fabric_cost_per_sheet = area_m2 * applied_unit_price
-    fabric_cost_total = fabric_cost_per_sheet * quantity_per_unit
-
-    fabric_unit_price_per_sheet = round(fabric_cost_per_sheet, 4)
-    fabric_unit_cost = round(fabric_cost_total, 2)
-    
-    # 기초가격 계산
-    base_price = usd_price_per_kg * exchange_rate * (1 + percent_applied / 100)  # 백분율을 소수로 변환
-
-    # 기본 submaterials 값 설정
-    if submaterials is None:
-        submaterials = {
-            "정제수": 1.20,
-            "명진 메인": 15.41,
-            "명진 소듐": 7.40,
-            "명진 인산": 1.39,
-            "SPC팩(파우치)": 56.24,
-            "영신피엔엘(캡스티커)": 19.16,
-            "나우텍(캡)": 33.33,
-            "영신피엔엘(이너스티커)": 18.54,
-            "지피엠(박스)": 77.77
-        }
+import tempfile
+import time
+from wetwipe_cost import (
+    SOLVE_VARIABLES, SWEEP_RESULT_COLUMNS, SWEEP_VARIABLES, IncrementalCost, calculate_wetwipe_cost,
+    calculate_wetwipe_cost_batch, prepare_bulk_inputs, sample_wetwipe_cost, solve_wetwipe_cost, sweep_wetwipe_cost,
+    tornado_wetwipe_cost
+)
+from wetwipe_report import (
+    BULK_TEMPLATE_COLUMNS, build_bulk_excel, build_bulk_pdf, build_result_excel, build_result_pdf,
+    bulk_estimate_records, compare_estimates, cost_chart_specs, estimate_cost_breakdown, price_histogram_spec,
+    quote_waterfall_spec, read_bulk_upload, sweep_heatmap_spec, tornado_chart_spec, write_estimate_history_excel
+)
+from pdf_report import register_pdf_fonts
+from cost_catalogue import load_cost_catalogue
+from estimate_queue import EstimateWriteQueue
+from fx_rates import cached_rate_provider_from_env
+from price_history import (
+    DEFAULT_PRICE_HISTORY_PATH, PriceHistory, compare_price_dates, load_price_history, price_history_from_table,
+    price_history_template
+)
+from result_cache import ResultCache, make_cache_key
+from stage_timer import StageTimer, serve_metrics
+from estimate_store import (
+    ESTIMATE_HEADERS, ESTIMATE_ID_FIELD, ESTIMATE_LIST_COLUMNS, ESTIMATE_TEXT_FIELDS, SAVED_AT_FIELD, USD_PRICE_FIELD,
+    EstimateChangedError, SheetsEstimateStore, SQLiteEstimateStore, estimate_versions, item_price_fields,
+    new_estimate_rows, other_cost_fields, parse_other_costs, query_estimate_table, restore_estimate
+)
 
-    # 기본 processing_costs 값 설정
-    if processing_costs is None:
-        processing_costs = {
-            "물류비": logistics_cost,
-            "노무비": labor_cost,
-            "4대보험+퇴직금": insurance_cost,
-            "제조경비": management_cost,
-            "이자비용": interest_cost,
-            "창고료": storage_cost
-        }
-        
-    # 기본 other_costs 값 설정
-    if other_costs is None:
-        other_costs = {
-            "택배비": 0.00,
-            "광고선전비": 0.00,
-            "부가세": 0.00
-        }
-
-    materials_total = fabric_cost_total + sum(submaterials.values())
-    processing_total = sum(processing_costs.values())
-    other_total = sum(other_costs.values())
-    total_cost = materials_total + processing_total + other_total
-
-    margin = total_cost * margin_rate
-    final_price = total_cost + margin + corporate_profit
-
-    cost_summary = {
-        "원단 가격": fabric_unit_cost,
-        "기초가격": round(base_price, 2),
-        **submaterials,
-        "-- 원부자재 소계": round(materials_total, 2),
-        **processing_costs,
-        "-- 임가공비 소계": round(processing_total, 2),
-        **other_costs,
-        "-- 기타 비용 소계": round(other_total, 2),
-        "총원가": round(total_cost, 2),
-        "마진({}%)".format(int(margin_rate * 100)): round(margin, 2),
-        "기업이윤": corporate_profit,
-        "제안가(판매가)": round(final_price, 2)
-    }
-
-    return cost_summary, fabric_unit_price_per_sheet, submaterials, processing_costs, other_costs, final_price, base_price
+run_started = time.perf_counter()
 
 st.set_page_config(page_title="물티슈 원가계산기", layout="centered")
+
+# 원가 항목 목록 (cost_items.toml, 입력 폼과 견적 로그 컬럼을 여기서 만듦)
+cost_catalogue = load_cost_catalogue()
 st.title("📦 물티슈 원가계산기")
 
-# Google Sheets 연결 설정
-def get_google_sheet():
+# 단계별 처리 시간 측정 (모든 세션이 공유)
+# 환경변수 WETWIPE_METRICS_PORT 를 지정하면 http://127.0.0.1:<포트>/metrics 에 Prometheus 형식으로 제공
+METRICS_PORT = os.environ.get("WETWIPE_METRICS_PORT")
+
+@st.cache_resource(show_spinner=False)
+def get_stage_timer():
+    timer = StageTimer()
+    if METRICS_PORT:
+        try:
+            serve_metrics(timer, os.environ.get("WETWIPE_METRICS_HOST", "127.0.0.1"), int(METRICS_PORT))
+        except OSError as e:
+            st.warning(f"처리 시간 지표 서버를 시작할 수 없습니다: {str(e)}")
+    return timer
+
+stage_timer = get_stage_timer()
+
+# 처리 시간 패널 표시 여부 (환경변수 WETWIPE_DEBUG=1 또는 주소에 ?debug=1)
+DEBUG_PANEL = os.environ.get("WETWIPE_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+# Google Sheets 연결 캐시 유지 시간 (초), 환경변수 WETWIPE_SHEETS_TTL 로 변경 가능
+SHEETS_CLIENT_TTL = int(os.environ.get("WETWIPE_SHEETS_TTL", 3600))
+
+# 재연결 후 한 번 더 시도할 연결/인증 오류인지 (requests 네트워크 오류는 OSError 하위 클래스)
+# API 오류는 인증 실패(401/403)만, 요청 한도 초과(429) 등은 재연결해도 소용없으므로 저장 대기열의 재시도 간격에 맡김
+SHEETS_RECONNECT_STATUS = (401, 403)
+
+def is_sheets_reconnect_error(error):
+    import gspread
+    from google.auth.exceptions import GoogleAuthError
+    if isinstance(error, gspread.exceptions.APIError):
+        return getattr(error.response, "status_code", None) in SHEETS_RECONNECT_STATUS
+    return isinstance(error, (GoogleAuthError, OSError))
+
+# Google Sheets 연결 설정 (프로세스 전체에서 공유, 재실행마다 인증하지 않음)
+@st.cache_resource(ttl=SHEETS_CLIENT_TTL, show_spinner=False)
+def _open_google_sheet():
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scope)
-    client = gspread.authorize(creds)
-    return client.open("Wetwipe Estimates").sheet1
+    with stage_timer.stage("sheets_connect"):
+        creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scope)
+        client = gspread.authorize(creds)
+        return client.open("Wetwipe Estimates").sheet1
+
+def get_google_sheet():
+    sheet = _open_google_sheet()
+    # 액세스 토큰이 만료됐으면 요청 전에 미리 갱신
+    creds = sheet.client.auth
+    if not creds.valid:
+        from google.auth.transport.requests import Request
+        with stage_timer.stage("sheets_auth_refresh"):
+            creds.refresh(Request())
+    return sheet
+
+def reset_google_sheet():
+    _open_google_sheet.clear()
+
+def with_google_sheet(operation):
+    # 캐시된 연결로 작업을 실행하고, 연결/인증 오류가 나면 캐시를 비운 뒤 한 번 재연결해서 다시 시도
+    try:
+        return operation(get_google_sheet())
+    except Exception as e:
+        if not is_sheets_reconnect_error(e):
+            raise
+        reset_google_sheet()
+        return operation(get_google_sheet())
+
+# 견적 저장소 설정, 환경변수 WETWIPE_STORAGE 로 선택
+#   sheets: Google Sheets 에만 저장 (기본값)
+#   sqlite: 로컬 SQLite 에만 저장 (오프라인/테스트용)
+#   mirror: 로컬 SQLite 에 저장하고 백그라운드에서 Google Sheets 로 동기화
+ESTIMATE_STORAGE = os.environ.get("WETWIPE_STORAGE", "sheets")
+ESTIMATE_STORAGE_MODES = ("sheets", "sqlite", "mirror")
+if ESTIMATE_STORAGE not in ESTIMATE_STORAGE_MODES:
+    # 오타로 아무 저장소에도 쓰지 않은 채 저장 성공이 표시되지 않도록 시작할 때 막음
+    st.error(f"WETWIPE_STORAGE 설정이 올바르지 않습니다: {ESTIMATE_STORAGE!r} (사용 가능: {', '.join(ESTIMATE_STORAGE_MODES)})")
+    st.stop()
+ESTIMATE_DB_PATH = os.environ.get("WETWIPE_DB_PATH", "estimates.sqlite3")
+
+# 저장 대기열 스풀 파일 경로, 환경변수 WETWIPE_SPOOL_PATH 로 변경 가능
+ESTIMATE_SPOOL_PATH = os.environ.get("WETWIPE_SPOOL_PATH", "estimate_spool.sqlite3")
+
+@st.cache_resource(show_spinner=False)
+def get_sheets_estimate_store():
+    return SheetsEstimateStore(with_google_sheet, ESTIMATE_HEADERS, ESTIMATE_TEXT_FIELDS)
+
+@st.cache_resource(show_spinner=False)
+def get_local_estimate_store():
+    return SQLiteEstimateStore(ESTIMATE_DB_PATH, ESTIMATE_HEADERS, ESTIMATE_TEXT_FIELDS)
+
+# 저장된 견적 전체를 한 번에 읽어서 캐시 (save_estimate가 쓸 때만 무효화)
+@st.cache_data(show_spinner=False)
+def load_estimate_table():
+    with stage_timer.stage("estimates_load"):
+        if ESTIMATE_STORAGE == "sheets":
+            return get_sheets_estimate_store().load_table()
+        return get_local_estimate_store().load_table()
+
+# 견적 이력 전체 Excel (임시 파일에 한 행씩 쓴 뒤 바이트로 읽음)
+# SQLite 는 묶음 단위로 읽어서 쓰고, 시트는 캐시된 목록을 그대로 사용
+def build_history_excel():
+    if ESTIMATE_STORAGE == "sheets":
+        table = load_estimate_table()
+        rows = (dict(zip(table.columns, values)) for values in table.itertuples(index=False, name=None))
+    else:
+        rows = get_local_estimate_store().iter_rows()
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "estimate_history.xlsx")
+        stage_timer.timed("history_excel", write_estimate_history_excel, rows, path)
+        with open(path, "rb") as f:
+            return f.read()
+
+# 시트에 쌓인 행을 한 번에 쓰고 캐시된 목록을 무효화
+def append_estimate_rows(rows):
+    stage_timer.timed("sheets_append", get_sheets_estimate_store().append_rows, rows)
+    load_estimate_table.clear()
+
+# 저장 대기열 (재실행 사이에도 유지, 백그라운드에서 묶어서 저장)
+@st.cache_resource(show_spinner=False)
+def get_estimate_write_queue():
+    queue = EstimateWriteQueue(append_estimate_rows, ESTIMATE_SPOOL_PATH)
+    queue.start()
+    return queue
+
+# 견적 검색 (한 페이지와 필요한 컬럼만 반환)
+def query_estimates(**filters):
+    if ESTIMATE_STORAGE == "sheets":
+        table = load_estimate_table()
+        return stage_timer.timed("estimates_query", query_estimate_table, table, **filters)
+    return stage_timer.timed("estimates_query", get_local_estimate_store().query, **filters)
+
+# 견적 여러 건 저장 (시트 저장은 대기열에 넣고 바로 반환, 대기열이 한 번에 묶어서 씀)
+# 내용이 같은 견적은 저장소가 건너뜀 (시트는 대기열이 보낼 때 확인)
+# 반환: 저장한(시트는 대기열에 넣은) 견적 수
+def save_estimates(records):
+    saved_at = datetime.datetime.now().isoformat(timespec="seconds")
+    # 컬럼명 -> 값 딕셔너리로 저장 (저장소가 자기 컬럼 순서에 맞춰서 씀), 고정 ID 와 내용 해시를 붙임
+    rows = new_estimate_rows(records, saved_at)
+
+    with stage_timer.stage("estimate_save"):
+        if ESTIMATE_STORAGE in ("sqlite", "mirror"):
+            rows = get_local_estimate_store().append_rows(rows)
+            if rows:
+                load_estimate_table.clear()
+        if ESTIMATE_STORAGE in ("sheets", "mirror") and rows:
+            get_estimate_write_queue().put_many(rows)
+    return len(rows)
 
 # 견적 저장 함수
 def save_estimate(data):
-    sheet = get_google_sheet()
-    headers = [
-        "견적명", "규격", "평량", "매수", "환율", "관세비율", "총원가", "제안가",
-        "원단 가격", "기초가격", "정제수", "명진 메인", "명진 소듐", "명진 인산",
-        "SPC팩(파우치)", "영신피엔엘(캡스티커)", "나우텍(캡)", "영신피엔엘(이너스티커)",
-        "지피엠(박스)", "물류비", "노무비", "4대보험+퇴직금", "제조경비", "이자비용",
-        "창고료", "기타비용1_이름", "기타비용2_이름", "기타비용3_이름",
-        "기타비용1", "기타비용2", "기타비용3", "마진율", "기업이윤"
-    ]
-    
-    # 헤더가 없으면 추가
-    if not sheet.row_values(1):
-        sheet.insert_row(headers, 1)
-    
-    # 데이터를 리스트로 변환
-    row_data = [data.get(header, "") for header in headers]
-    sheet.append_row(row_data)
-
-# 견적 불러오기 함수
-def load_estimate(row_index):
-    sheet = get_google_sheet()
-    headers = [
-        "견적명", "규격", "평량", "매수", "환율", "관세비율", "총원가", "제안가",
-        "원단 가격", "기초가격", "정제수", "명진 메인", "명진 소듐", "명진 인산",
-        "SPC팩(파우치)", "영신피엔엘(캡스티커)", "나우텍(캡)", "영신피엔엘(이너스티커)",
-        "지피엠(박스)", "물류비", "노무비", "4대보험+퇴직금", "제조경비", "이자비용",
-        "창고료", "기타비용1_이름", "기타비용2_이름", "기타비용3_이름",
-        "기타비용1", "기타비용2", "기타비용3", "마진율", "기업이윤"
-    ]
-    
-    # 헤더가 없으면 추가
-    if not sheet.row_values(1):
-        sheet.insert_row(headers, 1)
-    
-    row_data = sheet.row_values(row_index + 2)  # +2는 헤더와 1-based 인덱스 때문
-    
-    if not row_data:
-        return None
-        
-    # 데이터를 딕셔너리로 변환
-    data = dict(zip(headers, row_data))
-    
-    # 숫자 데이터 변환
-    numeric_fields = ["평량", "매수", "환율", "관세비율", "총원가", "제안가", "원단 가격", "기초가격",
-                     "정제수", "명진 메인", "명진 소듐", "명진 인산", "SPC팩(파우치)", "영신피엔엘(캡스티커)",
-                     "나우텍(캡)", "영신피엔엘(이너스티커)", "지피엠(박스)", "물류비", "노무비",
-                     "4대보험+퇴직금", "제조경비", "이자비용", "창고료", "기타비용1", "기타비용2",
-                     "기타비용3", "마진율", "기업이윤"]
-    
-    for field in numeric_fields:
-        if field in data and data[field]:
-            try:
-                data[field] = float(data[field])
-            except ValueError:
-                data[field] = 0.0
-    
-    return data
+    return save_estimates([data])
+
+# 견적 불러오기 함수 (시트는 캐시된 목록에서 읽으므로 추가 API 호출 없음)
+# row_index: 견적 키 (시트는 고정 ID, SQLite 는 행 id), version: 목록에서 본 버전 (estimate_versions)
+# 내용이 바뀌었으면 EstimateChangedError
+def load_estimate(row_index, version=None):
+    if ESTIMATE_STORAGE == "sheets":
+        table = load_estimate_table()
+        if row_index not in table.index:
+            return None
+        # 데이터를 딕셔너리로 변환
+        data = table.loc[row_index].to_dict()
+        # 목록은 캐시된 값이라 시트를 직접 고치거나 다른 프로세스가 저장한 변경이 보이지 않으므로
+        # ID 가 있는 행은 그 행만 시트에서 새로 읽어서 버전을 확인 (ID 가 없는 예전 행은 캐시된 값으로 확인)
+        if data.get(ESTIMATE_ID_FIELD):
+            data = get_sheets_estimate_store().get_row(data[ESTIMATE_ID_FIELD])
+            if data is None:
+                raise EstimateChangedError("목록을 불러온 뒤에 견적이 삭제되었습니다. 목록을 새로고침한 뒤 다시 선택하세요.")
+    else:
+        data = get_local_estimate_store().get_row(row_index)
+        if data is None:
+            return None
+
+    return restore_estimate(data, version)
+
+# 계산 결과 캐시 용량 (MB), 환경변수 WETWIPE_RESULT_CACHE_MB 로 변경 가능
+RESULT_CACHE_MB = int(os.environ.get("WETWIPE_RESULT_CACHE_MB", 64))
+
+# 입력값이 같은 계산 결과/차트/내보내기 파일 캐시 (모든 세션이 공유)
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    return ResultCache(max_bytes=RESULT_CACHE_MB * 1024 * 1024)
+
+# 단가 이력 파일, 환경변수 WETWIPE_PRICE_HISTORY 로 변경 가능
+PRICE_HISTORY_PATH = os.environ.get("WETWIPE_PRICE_HISTORY", DEFAULT_PRICE_HISTORY_PATH)
+
+# 단가 이력 (파일이 바뀌면 다시 읽음)
+# 반환: (단가 이력, 오류 메시지), 파일을 읽지 못하면 빈 이력이라 원가 항목 목록의 기본 단가를 사용
+@st.cache_resource(show_spinner=False, max_entries=1)
+def get_price_history(modified_at):
+    try:
+        return load_price_history(PRICE_HISTORY_PATH), None
+    except (OSError, ValueError) as e:
+        return PriceHistory(), str(e)
+
+price_history, price_history_error = get_price_history(
+    os.path.getmtime(PRICE_HISTORY_PATH) if os.path.exists(PRICE_HISTORY_PATH) else None
+)
+if price_history_error:
+    st.error(f"단가 이력 파일({PRICE_HISTORY_PATH})을 읽을 수 없어 기본 단가를 사용합니다: {price_history_error}")
+
+# 오늘 기준 단가 (입력 폼 기본값)
+current_prices = price_history.quote_prices(datetime.date.today(), cost_catalogue)
+
+# 환율 제공자 (fx_rates.py, 환경변수 WETWIPE_FX_* 로 설정)
+# 캐시된 환율만 읽어서 입력 폼 기본값으로 쓰고, 오래되면 백그라운드에서 갱신 (페이지가 기다리지 않음)
+@st.cache_resource(show_spinner=False)
+def get_fx_rates():
+    return cached_rate_provider_from_env()
+
+fx_rates = get_fx_rates()
+fx_snapshot = fx_rates.current()
+
+# PDF 생성 (폰트 등록과 PDF 그리기 시간을 따로 기록)
+def timed_pdf(build, *args):
+    with stage_timer.stage("pdf_fonts"):
+        register_pdf_fonts()
+    return stage_timer.timed("pdf", build, *args)
+
+# 아직 시트에 반영되지 않은 견적 수
+if ESTIMATE_STORAGE in ("sheets", "mirror"):
+    pending_estimates = get_estimate_write_queue().pending()
+    if pending_estimates:
+        st.sidebar.caption(f"⏳ Google Sheets 저장 대기 중: {pending_estimates}건")
 
 # 불러오기 버튼
+if st.sidebar.button("📦 대량 견적"):
+    st.session_state.show_bulk = True
+
+if st.sidebar.button("📈 민감도 분석"):
+    st.session_state.show_sweep = True
+
+if st.sidebar.button("🎯 목표 제안가 역산"):
+    st.session_state.show_solve = True
+
+if st.sidebar.button("💱 단가 기준 재견적"):
+    st.session_state.show_requote = True
+
 if st.sidebar.button("📂 지난 견적 불러오기"):
     st.session_state.show_estimates = True
 
+if st.sidebar.button("🔍 견적 비교"):
+    st.session_state.show_compare = True
+
 if st.session_state.get('show_estimates', False):
     st.subheader("📋 저장된 견적 목록")
-    sheet = get_google_sheet()
-    headers = [
-        "견적명", "규격", "평량", "매수", "환율", "관세비율", "총원가", "제안가",
-        "원단 가격", "기초가격", "정제수", "명진 메인", "명진 소듐", "명진 인산",
-        "SPC팩(파우치)", "영신피엔엘(캡스티커)", "나우텍(캡)", "영신피엔엘(이너스티커)",
-        "지피엠(박스)", "물류비", "노무비", "4대보험+퇴직금", "제조경비", "이자비용",
-        "창고료", "기타비용1_이름", "기타비용2_이름", "기타비용3_이름",
-        "기타비용1", "기타비용2", "기타비용3", "마진율", "기업이윤"
-    ]
-    
-    # 헤더가 없으면 추가
-    if not sheet.row_values(1):
-        sheet.insert_row(headers, 1)
-    
-    # 명시적인 헤더를 사용하여 데이터프레임 생성
-    records = sheet.get_all_records(expected_headers=headers)
-    df_log = pd.DataFrame(records)
-    
+    if st.button("🔄 목록 새로고침"):
+        load_estimate_table.clear()
+
+    # 검색 조건
+    col_search1, col_search2, col_search3 = st.columns(3)
+    with col_search1:
+        search_name = st.text_input("견적명 검색")
+    with col_search2:
+        search_spec = st.text_input("규격 검색", placeholder="예: 150x195")
+    with col_search3:
+        search_dates = st.date_input("저장일 범위", value=())
+    list_columns = ["견적명"] + st.multiselect(
+        "표시할 컬럼",
+        [header for header in ESTIMATE_HEADERS if header != "견적명"],
+        default=[column for column in ESTIMATE_LIST_COLUMNS if column != "견적명"]
+    )
+    date_from = search_dates[0] if len(search_dates) > 0 else None
+    date_to = search_dates[1] if len(search_dates) > 1 else date_from
+
+    # 현재 페이지만 조회 (검색 조건이 바뀌어 페이지 수가 줄면 마지막 페이지로)
+    page_size = st.session_state.get("estimate_page_size", 50)
+    page = st.session_state.get("estimate_page", 1)
+    # 불러올 때 버전 확인용으로 페이지의 모든 컬럼을 읽음 (표에는 선택한 컬럼만 표시)
+    filters = dict(name=search_name, spec=search_spec, date_from=date_from, date_to=date_to)
+    df_log, total_count = query_estimates(**filters, offset=(page - 1) * page_size, limit=page_size)
+    page_count = max(1, -(-total_count // page_size))
+    if page > page_count:
+        page = page_count
+        df_log, total_count = query_estimates(**filters, offset=(page - 1) * page_size, limit=page_size)
+    st.session_state.estimate_page = page
+
+    # 직전 실행에서 사용자가 본 견적별 버전 (버튼을 누르면 목록을 다시 읽으므로 이전 값과 비교)
+    listed_versions = st.session_state.get("estimate_versions", {})
+    st.session_state.estimate_versions = estimate_versions(df_log)
+
     if not df_log.empty:
-        st.dataframe(df_log)
+        st.dataframe(df_log[list_columns])
+
+        # 페이지 이동
+        col_page1, col_page2, col_page3 = st.columns([1, 1, 2])
+        with col_page1:
+            st.number_input("페이지", min_value=1, max_value=page_count, step=1, key="estimate_page")
+        with col_page2:
+            st.selectbox("페이지당 견적 수", [20, 50, 100], index=1, key="estimate_page_size")
+        with col_page3:
+            st.caption(f"총 {total_count:,}건 중 {(page - 1) * page_size + 1:,}-{(page - 1) * page_size + len(df_log):,}번째 ({page}/{page_count} 페이지)")
+        st.download_button(
+            label="📥 전체 견적 이력 Excel",
+            data=build_history_excel,
+            file_name=f"견적이력_{datetime.date.today():%Y%m%d}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
         
-        selected_index = st.selectbox("📌 복원할 견적 선택", df_log.index)
+        selected_index = st.selectbox(
+            "📌 복원할 견적 선택", df_log.index,
+            format_func=lambda index: f"{index}: {df_log.loc[index, '견적명']}"
+        )
         if st.button("📤 이 견적으로 계산기 채우기"):
-            data = load_estimate(selected_index)
-            if data:
-                # 세션 상태 초기화
-                st.session_state.clear()
-                # 데이터 저장
-                st.session_state.update(data)
-                st.session_state.show_estimates = False
-                st.rerun()
+            try:
+                data = load_estimate(selected_index, listed_versions.get(selected_index))
+            except EstimateChangedError as e:
+                # 다음 실행에서 목록을 다시 읽음
+                load_estimate_table.clear()
+                st.warning(str(e))
             else:
-                st.error("견적을 불러오는데 실패했습니다.")
-    else:
+                if data:
+                    # 세션 상태 초기화
+                    st.session_state.clear()
+                    # 데이터 저장
+                    st.session_state.update(data)
+                    st.session_state.show_estimates = False
+                    st.rerun()
+                else:
+                    st.error("견적을 불러오는데 실패했습니다.")
+    elif total_count == 0 and not (search_name or search_spec or date_from):
         st.info("저장된 견적이 없습니다.")
         st.session_state.show_estimates = False
+    else:
+        st.info("검색 조건에 맞는 견적이 없습니다.")
 
 # 기본값 설정
 default_values = {
@@ -210,18 +376,13 @@ default_values = {
     "height": 195,
     "gsm": 40,
     "quantity": 120,
-    "exchange_rate": 1500,
+    "exchange_rate": round(fx_snapshot.rate, 2),
     "percent_applied": 1.2,
     "margin_rate": 0.1,
     "corporate_profit": 100.00,
     "estimate_name": "",
-    "usd_price_per_kg": 1.46,
-    "other_cost1_name": "택배비",
-    "other_cost2_name": "광고선전비",
-    "other_cost3_name": "부가세",
-    "other_cost1_value": 0.00,
-    "other_cost2_value": 0.00,
-    "other_cost3_value": 0.00,
+    "usd_price_per_kg": current_prices["usd_price_per_kg"],
+    "other_cost_items": dict(cost_catalogue.other_costs),
     "show_estimates": False
 }
 
@@ -230,6 +391,89 @@ for key, default in default_values.items():
     if key not in st.session_state:
         st.session_state[key] = default
 
+# 원부자재/임가공비 항목 금액 (불러온 견적에 없는 항목은 기본값)
+def saved_item_cost(name, default):
+    value = st.session_state.get(name, "")
+    return float(default if value in ("", None) or pd.isna(value) else value)
+
+# 대량 견적: 업로드한 SKU 목록을 한 번에 계산하고 하나의 Excel/PDF 로 내보내기
+if st.session_state.get('show_bulk', False):
+    st.subheader("📦 대량 견적")
+    st.caption(
+        "규격(예: 150x195) 또는 가로/세로와 평량, 매수 등을 컬럼으로 넣어 주세요. "
+        "빠진 컬럼은 계산기 기본값을 쓰고, 원부자재/임가공비 항목명을 컬럼으로 넣으면 행별 금액으로 계산합니다. "
+        "마진율은 소수(10% → 0.1)로 입력합니다."
+    )
+    template_row = [
+        "예시견적", f"{default_values['width']}x{default_values['height']}", default_values["gsm"],
+        default_values["quantity"], default_values["exchange_rate"], default_values["percent_applied"],
+        default_values["margin_rate"], default_values["corporate_profit"], default_values["usd_price_per_kg"]
+    ]
+    st.download_button(
+        "📄 업로드 양식 받기",
+        data=pd.DataFrame([template_row], columns=BULK_TEMPLATE_COLUMNS).to_csv(index=False).encode("utf-8-sig"),
+        file_name="wetwipe_bulk_template.csv",
+        mime="text/csv"
+    )
+
+    uploaded_file = st.file_uploader("SKU 목록 (CSV/XLSX)", type=["csv", "xlsx"])
+    if uploaded_file is not None:
+        bulk_defaults = {
+            "gsm": default_values["gsm"],
+            "quantity_per_unit": default_values["quantity"],
+            "exchange_rate": default_values["exchange_rate"],
+            "percent_applied": default_values["percent_applied"],
+            "margin_rate": default_values["margin_rate"],
+            "corporate_profit": default_values["corporate_profit"],
+            "usd_price_per_kg": default_values["usd_price_per_kg"]
+        }
+        try:
+            bulk_inputs = prepare_bulk_inputs(read_bulk_upload(uploaded_file), bulk_defaults)
+        except ValueError as e:
+            st.error(f"업로드한 파일을 읽을 수 없습니다: {str(e)}")
+        else:
+            # 원부자재/임가공비는 입력 폼과 같은 오늘 기준 단가 (업로드 파일에 항목 컬럼이 있으면 행별 금액)
+            bulk_results = stage_timer.timed(
+                "bulk_calculate", calculate_wetwipe_cost_batch, bulk_inputs,
+                submaterials=current_prices["submaterials"], processing_costs=current_prices["processing_costs"]
+            )
+            st.dataframe(pd.concat([bulk_inputs[["견적명"]], bulk_results], axis=1))
+            st.caption(f"총 {len(bulk_results):,}건 계산 완료")
+
+            # 내보내기 파일은 다운로드할 때 만들고 같은 업로드 파일, 같은 기본값(환율/원단 가격 등)과 단가면 재사용
+            bulk_key = make_cache_key(
+                "bulk", hashlib.sha256(uploaded_file.getvalue()).hexdigest(), bulk_defaults,
+                current_prices["submaterials"], current_prices["processing_costs"]
+            )
+            result_cache = get_result_cache()
+            col_bulk1, col_bulk2, col_bulk3 = st.columns(3)
+            with col_bulk1:
+                st.download_button(
+                    "📥 전체 Excel 다운로드",
+                    data=lambda: result_cache.get_or_create(bulk_key, "excel", lambda: stage_timer.timed("excel", build_bulk_excel, bulk_inputs, bulk_results)),
+                    file_name="wetwipe_bulk_cost.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    key="bulk_excel_download"
+                )
+            with col_bulk2:
+                st.download_button(
+                    "📄 전체 PDF 다운로드",
+                    data=lambda: result_cache.get_or_create(bulk_key, "pdf", lambda: timed_pdf(build_bulk_pdf, bulk_inputs, bulk_results)),
+                    file_name="wetwipe_bulk_cost.pdf",
+                    mime="application/pdf",
+                    key="bulk_pdf_download"
+                )
+            with col_bulk3:
+                if st.button("💾 전체 견적 저장"):
+                    saved_count = save_estimates(bulk_estimate_records(bulk_inputs, bulk_results))
+                    st.success(f"{saved_count:,}건의 견적을 한 번에 저장했습니다!")
+                    if saved_count < len(bulk_results):
+                        st.info(f"{len(bulk_results) - saved_count:,}건은 방금 저장한 견적과 내용이 같아 건너뛰었습니다.")
+
+    if st.button("닫기", key="close_bulk"):
+        st.session_state.show_bulk = False
+        st.rerun()
+
 # 불러온 데이터가 있으면 세션 상태 업데이트
 if '규격' in st.session_state:
     try:
@@ -244,18 +488,17 @@ if '규격' in st.session_state:
             "margin_rate": st.session_state['마진율'],
             "corporate_profit": st.session_state['기업이윤'],
             "estimate_name": st.session_state['견적명'],
-            "usd_price_per_kg": st.session_state['기초가격'] / (st.session_state['환율'] * (1 + st.session_state['관세비율'] / 100)),  # 기초가격에서 원단 가격 계산
-            "other_cost1_name": st.session_state['기타비용1_이름'],
-            "other_cost2_name": st.session_state['기타비용2_이름'],
-            "other_cost3_name": st.session_state['기타비용3_이름'],
-            "other_cost1_value": st.session_state['기타비용1'],
-            "other_cost2_value": st.session_state['기타비용2'],
-            "other_cost3_value": st.session_state['기타비용3']
+            # 저장된 원단 가격, 없는 예전 견적은 기초가격에서 계산
+            "usd_price_per_kg": st.session_state[USD_PRICE_FIELD] if st.session_state.get(USD_PRICE_FIELD, "") != "" else st.session_state['기초가격'] / (st.session_state['환율'] * (1 + st.session_state['관세비율'] / 100)),
+            "other_cost_items": parse_other_costs(st.session_state)
         })
     except Exception as e:
         st.error(f"데이터 복원 중 오류가 발생했습니다: {str(e)}")
 
-with st.form("calc_form"):
+# 실시간 미리보기: 입력값을 폼 대신 일반 컨테이너에 두어서 값을 바꿀 때마다(Enter/포커스 이동 시) 다시 실행하고,
+# 바뀐 입력에 걸린 소계만 다시 계산해서 보여줌 (저장과 결과/차트/내보내기는 "계산 및 저장"을 누를 때만)
+live_preview = st.toggle("⚡ 실시간 미리보기", key="live_preview", help="입력값을 바꿀 때마다 원가를 바로 다시 계산합니다. 저장은 버튼을 눌러야 합니다.")
+with (st.container(border=True) if live_preview else st.form("calc_form")):
     st.subheader("📥 기본 입력값")
     
     # 견적명
@@ -271,50 +514,47 @@ with st.form("calc_form"):
     with col2:
         height = st.number_input("원단 세로길이 (mm)", value=st.session_state.height)
         quantity = st.number_input("수량 (매수)", value=st.session_state.quantity)
-        exchange_rate = st.number_input("환율 (₩/$)", value=st.session_state.exchange_rate)
+        exchange_rate = st.number_input("환율 (₩/$)", value=float(st.session_state.exchange_rate))
+        fx_status = fx_snapshot.as_dict(fx_rates.max_age)
+        if fx_status["fetched_at"] is None:
+            st.warning(f"환율 정보를 아직 받지 못해 기본값 {fx_snapshot.rate:,.2f} 을 사용합니다.")
+        elif fx_status["stale"]:
+            st.warning(f"현재 환율 {fx_snapshot.rate:,.2f} 은 {fx_status['fetched_at']} 기준으로 오래된 값입니다.")
+        else:
+            st.caption(f"현재 환율 {fx_snapshot.rate:,.2f} ({fx_status['fetched_at']} 기준)")
         percent_applied = st.number_input("관세 포함 비율 (%)", value=st.session_state.percent_applied)
         st.session_state.percent_applied = percent_applied
     
     # 원부자재 비용
     st.markdown("### 원부자재 비용")
     submaterials = {
-        "정제수": st.number_input("정제수 (원)", value=float(st.session_state.get("정제수", 1.20)), format="%.4f"),
-        "명진 메인": st.number_input("명진 메인 (원)", value=float(st.session_state.get("명진 메인", 15.41)), format="%.4f"),
-        "명진 소듐": st.number_input("명진 소듐 (원)", value=float(st.session_state.get("명진 소듐", 7.40)), format="%.4f"),
-        "명진 인산": st.number_input("명진 인산 (원)", value=float(st.session_state.get("명진 인산", 1.39)), format="%.4f"),
-        "SPC팩(파우치)": st.number_input("SPC팩(파우치) (원)", value=float(st.session_state.get("SPC팩(파우치)", 56.24)), format="%.4f"),
-        "영신피엔엘(캡스티커)": st.number_input("영신피엔엘(캡스티커) (원)", value=float(st.session_state.get("영신피엔엘(캡스티커)", 19.16)), format="%.4f"),
-        "나우텍(캡)": st.number_input("나우텍(캡) (원)", value=float(st.session_state.get("나우텍(캡)", 33.33)), format="%.4f"),
-        "영신피엔엘(이너스티커)": st.number_input("영신피엔엘(이너스티커) (원)", value=float(st.session_state.get("영신피엔엘(이너스티커)", 18.54)), format="%.4f"),
-        "지피엠(박스)": st.number_input("지피엠(박스) (원)", value=float(st.session_state.get("지피엠(박스)", 77.77)), format="%.4f")
+        name: st.number_input(f"{name} (원)", value=saved_item_cost(name, default), format="%.4f")
+        for name, default in current_prices["submaterials"].items()
     }
     
     # 임가공비
     st.markdown("### 임가공비")
     processing_costs = {
-        "물류비": st.number_input("물류비 (원)", value=float(st.session_state.get("물류비", 28.57)), format="%.4f"),
-        "노무비": st.number_input("노무비 (원)", value=float(st.session_state.get("노무비", 23.42)), format="%.4f"),
-        "4대보험+퇴직금": st.number_input("4대보험+퇴직금 (원)", value=float(st.session_state.get("4대보험+퇴직금", 4.17)), format="%.4f"),
-        "제조경비": st.number_input("제조경비 (원)", value=float(st.session_state.get("제조경비", 21.26)), format="%.4f"),
-        "이자비용": st.number_input("이자비용 (원)", value=float(st.session_state.get("이자비용", 17.01)), format="%.4f"),
-        "창고료": st.number_input("창고료 (원)", value=float(st.session_state.get("창고료", 5.10)), format="%.4f")
+        name: st.number_input(f"{name} (원)", value=saved_item_cost(name, default), format="%.4f")
+        for name, default in current_prices["processing_costs"].items()
     }
     
-    # 기타 비용
+    # 기타 비용 (행을 추가/삭제해서 항목 수를 바꿀 수 있음, 항목명이 빈 행은 무시)
     st.markdown("### 기타 비용")
-    col3, col4 = st.columns(2)
-    with col3:
-        other_cost_names = {
-            "cost1": st.text_input("기타 비용 항목 1", value=st.session_state.other_cost1_name),
-            "cost2": st.text_input("기타 비용 항목 2", value=st.session_state.other_cost2_name),
-            "cost3": st.text_input("기타 비용 항목 3", value=st.session_state.other_cost3_name)
-        }
-    with col4:
-        other_cost_values = {
-            other_cost_names["cost1"]: st.number_input("금액 1 (원)", value=st.session_state.other_cost1_value, format="%.4f"),
-            other_cost_names["cost2"]: st.number_input("금액 2 (원)", value=st.session_state.other_cost2_value, format="%.4f"),
-            other_cost_names["cost3"]: st.number_input("금액 3 (원)", value=st.session_state.other_cost3_value, format="%.4f")
-        }
+    other_cost_table = st.data_editor(
+        pd.DataFrame({
+            "항목": list(st.session_state.other_cost_items),
+            "금액 (원)": pd.Series(list(st.session_state.other_cost_items.values()), dtype=float)
+        }),
+        num_rows="dynamic",
+        hide_index=True,
+        column_config={"금액 (원)": st.column_config.NumberColumn(format="%.4f")}
+    )
+    other_cost_values = {
+        name.strip(): 0.0 if pd.isna(value) else float(value)
+        for name, value in zip(other_cost_table["항목"], other_cost_table["금액 (원)"])
+        if isinstance(name, str) and name.strip()
+    }
     
     # 마진율과 기업이윤
     col5, col6 = st.columns(2)
@@ -323,17 +563,49 @@ with st.form("calc_form"):
     with col6:
         corporate_profit = st.number_input("기업이윤 (원)", value=st.session_state.corporate_profit, format="%.4f")
     
-    submitted = st.form_submit_button("📊 계산하기")
+    if live_preview:
+        if "cost_preview" not in st.session_state:
+            st.session_state.cost_preview = IncrementalCost()
+        preview, _, changed_items = stage_timer.timed(
+            "preview", st.session_state.cost_preview.update,
+            width, height, gsm, exchange_rate, percent_applied, quantity, margin_rate,
+            usd_price_per_kg, submaterials, processing_costs, other_cost_values, corporate_profit
+        )
+        st.markdown("### ⚡ 미리보기")
+        preview_columns = st.columns(4)
+        for column, name in zip(preview_columns, ["-- 원부자재 소계", "-- 임가공비 소계", "총원가", "제안가(판매가)"]):
+            column.metric(name.removeprefix("-- "), f"{preview[name]:,.2f} 원")
+        with st.expander("항목별 금액"):
+            st.dataframe(
+                pd.DataFrame({
+                    "항목": [name.removeprefix("-- ") for name in preview],
+                    "금액 (원)": list(preview.values()),
+                    "변경": ["●" if name in changed_items else "" for name in preview],
+                }),
+                hide_index=True
+            )
+        submitted = st.button("💾 계산 및 저장", type="primary")
+    else:
+        submitted = st.form_submit_button("📊 계산하기")
 
 if submitted:
-    result, unit_price, submaterials, processing_costs, other_costs, final_price, base_price = calculate_wetwipe_cost(
-        width, height, gsm, exchange_rate, percent_applied, quantity,
-        margin_rate=margin_rate,
-        usd_price_per_kg=usd_price_per_kg,
-        submaterials=submaterials,
-        processing_costs=processing_costs,
-        other_costs=other_cost_values,
-        corporate_profit=corporate_profit
+    # 같은 입력값이면 계산 결과와 차트, 내보내기 파일을 캐시에서 재사용
+    result_cache = get_result_cache()
+    result_key = make_cache_key(
+        width, height, gsm, exchange_rate, percent_applied, quantity, margin_rate,
+        usd_price_per_kg, submaterials, processing_costs, other_cost_values, corporate_profit
+    )
+    result, unit_price, submaterials, processing_costs, other_costs, final_price, base_price = result_cache.get_or_create(
+        result_key, "calculation", lambda: stage_timer.timed(
+            "calculate", calculate_wetwipe_cost,
+            width, height, gsm, exchange_rate, percent_applied, quantity,
+            margin_rate=margin_rate,
+            usd_price_per_kg=usd_price_per_kg,
+            submaterials=submaterials,
+            processing_costs=processing_costs,
+            other_costs=other_cost_values,
+            corporate_profit=corporate_profit
+        )
     )
 
     # 견적 데이터 준비
@@ -348,34 +620,20 @@ if submitted:
         "제안가": result["제안가(판매가)"],
         "원단 가격": result["원단 가격"],
         "기초가격": result["기초가격"],
-        "정제수": result["정제수"],
-        "명진 메인": result["명진 메인"],
-        "명진 소듐": result["명진 소듐"],
-        "명진 인산": result["명진 인산"],
-        "SPC팩(파우치)": result["SPC팩(파우치)"],
-        "영신피엔엘(캡스티커)": result["영신피엔엘(캡스티커)"],
-        "나우텍(캡)": result["나우텍(캡)"],
-        "영신피엔엘(이너스티커)": result["영신피엔엘(이너스티커)"],
-        "지피엠(박스)": result["지피엠(박스)"],
-        "물류비": result["물류비"],
-        "노무비": result["노무비"],
-        "4대보험+퇴직금": result["4대보험+퇴직금"],
-        "제조경비": result["제조경비"],
-        "이자비용": result["이자비용"],
-        "창고료": result["창고료"],
-        "기타비용1_이름": other_cost_names["cost1"],
-        "기타비용2_이름": other_cost_names["cost2"],
-        "기타비용3_이름": other_cost_names["cost3"],
-        "기타비용1": result[other_cost_names["cost1"]],
-        "기타비용2": result[other_cost_names["cost2"]],
-        "기타비용3": result[other_cost_names["cost3"]],
+        USD_PRICE_FIELD: usd_price_per_kg,
+        **item_price_fields({name: result[name] for name in cost_catalogue.item_names()}),
+        **other_cost_fields(other_cost_values),
         "마진율": margin_rate,
         "기업이윤": corporate_profit
     }
 
-    # 견적 저장
-    save_estimate(estimate_data)
-    st.success("견적이 Google Sheets에 자동 저장되었습니다!")
+    # 견적 저장 (같은 입력으로 다시 계산하면 저장하지 않음)
+    if not save_estimate(estimate_data):
+        st.info("방금 같은 내용의 견적을 저장해서 다시 저장하지 않았습니다.")
+    elif ESTIMATE_STORAGE == "sqlite":
+        st.success("견적이 로컬 저장소에 자동 저장되었습니다!")
+    else:
+        st.success("견적이 저장 대기열에 추가되었습니다. 잠시 후 Google Sheets에 자동 저장됩니다!")
 
     # 계산 결과를 session_state에 저장
     st.session_state.result = result
@@ -383,7 +641,6 @@ if submitted:
     st.session_state.submaterials = submaterials
     st.session_state.processing_costs = processing_costs
     st.session_state.other_costs = other_costs
-    st.session_state.other_cost_names = other_cost_names
     st.session_state.calculated = True
 
     # 계산 결과 표시
@@ -501,104 +758,47 @@ if submitted:
         """, unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
+    # PDF/Excel 파일은 다운로드 버튼을 누를 때 만들고, 같은 견적이면 캐시에서 재사용
+    # (다운로드 콜백은 별도 스레드에서 실행되므로 session_state 대신 result 를 직접 넘김)
     # PDF 저장
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    import matplotlib.font_manager as fm
-
-    # 한글 폰트 설정
-    nanum_font_path = fm.findfont("NanumGothic")
-    pdfmetrics.registerFont(TTFont("NanumGothic", nanum_font_path))
-    pdfmetrics.registerFont(UnicodeCIDFont("HYGothic-Medium"))
-
-    pdf_buffer = BytesIO()
-    c = canvas.Canvas(pdf_buffer, pagesize=A4)
-    c.setFont("NanumGothic", 12)
-
-    # PDF 디자인 개선
-    c.setFillColorRGB(0.2, 0.2, 0.2)
-    c.setFont("NanumGothic", 16)
-    c.drawString(50, 800, "📄 물티슈 원가계산 결과")
-
-    c.setFont("NanumGothic", 12)
-    c.setFillColorRGB(0.4, 0.4, 0.4)
-    y = 760
-    for k, v in st.session_state.result.items():
-        c.drawString(50, y, f"{k}: {v:,} 원")
-        y -= 20
-        if y < 50:
-            c.showPage()
-            c.setFont("NanumGothic", 12)
-            y = 800
-
-    c.save()
     st.download_button(
         "📄 PDF로 다운로드", 
-        data=pdf_buffer.getvalue(), 
+        data=lambda: result_cache.get_or_create(result_key, "pdf", lambda: timed_pdf(build_result_pdf, result)), 
         file_name="wetwipe_cost.pdf",
+        mime="application/pdf",
         key="pdf_download"
     )
 
     # Excel 저장
-    df_result = pd.DataFrame(st.session_state.result.items(), columns=["항목", "금액 (원)"])
-    excel_buffer = BytesIO()
-    with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
-        df_result.to_excel(writer, index=False, sheet_name="견적서")
-        worksheet = writer.sheets["견적서"]
-        worksheet.set_column('A:B', 30)  # 열 너비 조정
     st.download_button(
         "📥 Excel로 다운로드", 
-        data=excel_buffer.getvalue(), 
+        data=lambda: result_cache.get_or_create(result_key, "excel", lambda: stage_timer.timed("excel", build_result_excel, result)), 
         file_name="wetwipe_cost.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         key="excel_download"
     )
 
     # 시각화
     st.subheader("📊 원가 구성 시각화")
+    charts = result_cache.get_or_create(
+        result_key, "charts",
+        lambda: stage_timer.timed(
+            "charts", cost_chart_specs,
+            st.session_state.result, st.session_state.submaterials, st.session_state.processing_costs
+        )
+    )
     
     # 전체 비용 구성 파이 차트
     st.markdown("#### 전체 비용 구성")
-    total_costs = {
-        "원단": st.session_state.result["원단 가격"],
-        "원부자재": sum(st.session_state.submaterials.values()),
-        "임가공비": sum(st.session_state.processing_costs.values())
-    }
-    
-    fig1, ax1 = plt.subplots(figsize=(10, 6))
-    ax1.pie(total_costs.values(), labels=total_costs.keys(), autopct='%1.1f%%', startangle=90)
-    ax1.axis('equal')
-    st.pyplot(fig1)
+    st.vega_lite_chart(charts["total"])
     
     # 원부자재 비용 구성
     st.markdown("#### 원부자재 비용 구성")
-    fig2, ax2 = plt.subplots(figsize=(12, 6))
-    submaterials_data = pd.DataFrame({
-        "항목": list(st.session_state.submaterials.keys()),
-        "비용": list(st.session_state.submaterials.values())
-    })
-    submaterials_data = submaterials_data.sort_values("비용", ascending=True)
-    ax2.barh(submaterials_data["항목"], submaterials_data["비용"], color="skyblue")
-    ax2.set_xlabel("비용 (원)")
-    ax2.set_title("원부자재 항목별 비용")
-    for i, v in enumerate(submaterials_data["비용"]):
-        ax2.text(v, i, f"{v:,.2f} 원", va='center')
-    st.pyplot(fig2)
+    st.vega_lite_chart(charts["submaterials"])
     
     # 임가공비 구성
     st.markdown("#### 임가공비 구성")
-    fig3, ax3 = plt.subplots(figsize=(12, 6))
-    processing_data = pd.DataFrame({
-        "항목": list(st.session_state.processing_costs.keys()),
-        "비용": list(st.session_state.processing_costs.values())
-    })
-    processing_data = processing_data.sort_values("비용", ascending=True)
-    ax3.barh(processing_data["항목"], processing_data["비용"], color="lightgreen")
-    ax3.set_xlabel("비용 (원)")
-    ax3.set_title("임가공비 항목별 비용")
-    for i, v in enumerate(processing_data["비용"]):
-        ax3.text(v, i, f"{v:,.2f} 원", va='center')
-    st.pyplot(fig3)
+    st.vega_lite_chart(charts["processing"])
     
     # 비용 상세 테이블
     st.markdown("#### 비용 상세 내역")
@@ -612,3 +812,236 @@ if submitted:
         "비용": "{:,.2f} 원",
         "비율": "{:.2f}%"
     }))
+
+# 단가 기준 재견적: 저장된 견적을 두 기준일의 단가로 다시 계산해서 비교
+if st.session_state.get('show_requote', False):
+    st.subheader("💱 단가 기준 재견적")
+    st.caption(
+        "단가 이력(항목, 적용일, 단가)에 있는 항목만 기준일에 적용 중인 단가로 바꾸고, "
+        "환율/관세/기타 비용과 이력이 없는 항목은 저장된 값 그대로 다시 계산합니다."
+    )
+    today = datetime.date.today()
+    st.download_button(
+        "📄 현재 단가로 이력 양식 받기",
+        data=price_history_template(price_history, today, cost_catalogue).to_csv(index=False).encode("utf-8-sig"),
+        file_name="wetwipe_price_history.csv",
+        mime="text/csv"
+    )
+    uploaded_history = st.file_uploader("단가 이력 (CSV/XLSX, 없으면 기본 단가 이력 파일 사용)", type=["csv", "xlsx"])
+    requote_history = price_history
+    if uploaded_history is not None:
+        try:
+            requote_history = price_history_from_table(read_bulk_upload(uploaded_history), cost_catalogue)
+        except ValueError as e:
+            st.error(f"단가 이력을 읽을 수 없습니다: {str(e)}")
+    st.caption(f"단가 이력 {len(requote_history):,}건 (항목 {len(requote_history.items())}개)")
+
+    col_requote1, col_requote2 = st.columns(2)
+    with col_requote1:
+        use_saved_date = st.checkbox("기준일 A 를 견적별 저장일로", value=True)
+        date_a = None if use_saved_date else st.date_input("기준일 A", value=today - datetime.timedelta(days=90))
+    with col_requote2:
+        date_b = st.date_input("기준일 B", value=today)
+
+    estimate_table = load_estimate_table()
+    if estimate_table.empty:
+        st.info("저장된 견적이 없습니다.")
+    else:
+        comparison = stage_timer.timed(
+            "requote", compare_price_dates, estimate_table, requote_history, date_a, date_b, cost_catalogue
+        )
+        st.dataframe(comparison, hide_index=True)
+        st.caption(f"총 {len(comparison):,}건, 평균 차이율 {comparison['차이율(%)'].mean():.2f}%")
+        st.download_button(
+            "📥 재견적 결과 CSV 다운로드",
+            data=comparison.to_csv(index=False).encode("utf-8-sig"),
+            file_name="wetwipe_requote.csv",
+            mime="text/csv"
+        )
+
+    if st.button("닫기", key="close_requote"):
+        st.session_state.show_requote = False
+        st.rerun()
+
+# 견적 비교: 캐시된 견적 목록에서 여러 견적을 골라 기준 견적 대비 항목별 차이를 한 번에 계산
+# (견적을 하나씩 불러오지 않으므로 세션 초기화/재실행 없음)
+if st.session_state.get('show_compare', False):
+    st.subheader("🔍 견적 비교")
+    estimate_table = load_estimate_table()
+    if estimate_table.empty:
+        st.info("저장된 견적이 없습니다.")
+    else:
+        col_compare1, col_compare2 = st.columns(2)
+        with col_compare1:
+            compare_name = st.text_input("견적명 검색", key="compare_name")
+        with col_compare2:
+            compare_spec = st.text_input("규격 검색", key="compare_spec", placeholder="예: 150x195")
+        candidates, _ = query_estimate_table(
+            estimate_table, name=compare_name, spec=compare_spec, columns=["견적명", SAVED_AT_FIELD],
+            limit=len(estimate_table)
+        )
+        estimate_labels = {
+            index: f"{index}: {name} ({saved_at})" if saved_at else f"{index}: {name}"
+            for index, name, saved_at in candidates.itertuples()
+        }
+        compare_indices = st.multiselect(
+            "비교할 견적 (선택하지 않으면 검색된 견적 전체)", list(estimate_labels), format_func=estimate_labels.get
+        ) or list(estimate_labels)
+
+        if len(compare_indices) < 2:
+            st.info("비교하려면 견적이 2건 이상 필요합니다.")
+        else:
+            breakdown = stage_timer.timed("compare", estimate_cost_breakdown, estimate_table.loc[compare_indices])
+            base_index = st.selectbox("기준 견적", compare_indices, format_func=estimate_labels.get)
+            differences = compare_estimates(breakdown, base_index)
+            names = estimate_table.loc[compare_indices, ["견적명", "규격", SAVED_AT_FIELD]]
+
+            show_amounts = st.radio("표시", ["기준 대비 차이", "금액"], horizontal=True) == "금액"
+            st.dataframe(pd.concat([names, breakdown.round(2) if show_amounts else differences], axis=1))
+            st.caption(f"{len(compare_indices):,}건 비교, 기준 제안가 {breakdown.at[base_index, '제안가']:,.2f} 원")
+
+            target_index = st.selectbox(
+                "폭포 차트로 볼 견적", [index for index in compare_indices if index != base_index],
+                format_func=estimate_labels.get
+            )
+            st.vega_lite_chart(quote_waterfall_spec(
+                breakdown, base_index, target_index,
+                f"기준 {estimate_table.at[base_index, '견적명']}", str(estimate_table.at[target_index, '견적명'])
+            ))
+            st.download_button(
+                "📥 비교 결과 CSV 다운로드",
+                data=pd.concat([names, breakdown.round(2), differences.add_prefix("차이 ")], axis=1).to_csv().encode("utf-8-sig"),
+                file_name="wetwipe_compare.csv",
+                mime="text/csv"
+            )
+
+    if st.button("닫기", key="close_compare"):
+        st.session_state.show_compare = False
+        st.rerun()
+
+# 현재 입력값 (민감도 분석과 목표 제안가 역산의 기준)
+form_inputs = {
+    "width_mm": width,
+    "height_mm": height,
+    "gsm": gsm,
+    "exchange_rate": exchange_rate,
+    "percent_applied": percent_applied,
+    "quantity_per_unit": quantity,
+    "margin_rate": margin_rate,
+    "usd_price_per_kg": usd_price_per_kg,
+    "corporate_profit": corporate_profit
+}
+form_items = dict(submaterials=submaterials, processing_costs=processing_costs, other_costs=other_cost_values)
+
+# 민감도 분석: 현재 입력값을 기준으로 환율/원단 가격/관세/평량을 바꿔 가며 제안가 계산
+if st.session_state.get('show_sweep', False):
+    st.subheader("📈 민감도 분석")
+    sweep_base = form_inputs
+    sweep_items = form_items
+
+    col_sweep1, col_sweep2 = st.columns(2)
+    with col_sweep1:
+        sweep_spread = st.slider("기준값 대비 변동폭 (±%)", 1, 50, 20) / 100
+    with col_sweep2:
+        sweep_steps = st.slider("격자 단계 수", 5, 100, 50)
+    sweep_ranges = {
+        name: (sweep_base[name] * (1 - sweep_spread), sweep_base[name] * (1 + sweep_spread))
+        for name in SWEEP_VARIABLES
+    }
+
+    tab_grid, tab_tornado, tab_monte_carlo = st.tabs(["격자 분석", "토네이도", "몬테카를로"])
+    with tab_grid:
+        col_axis1, col_axis2 = st.columns(2)
+        with col_axis1:
+            sweep_x = st.selectbox("가로축", list(SWEEP_VARIABLES), format_func=SWEEP_VARIABLES.get, index=0)
+        with col_axis2:
+            sweep_y = st.selectbox("세로축", [name for name in SWEEP_VARIABLES if name != sweep_x], format_func=SWEEP_VARIABLES.get)
+        sweep = stage_timer.timed(
+            "sweep", sweep_wetwipe_cost, sweep_base,
+            {name: np.linspace(*sweep_ranges[name], sweep_steps) for name in (sweep_x, sweep_y)},
+            **sweep_items
+        )
+        st.vega_lite_chart(stage_timer.timed("sweep_charts", sweep_heatmap_spec, sweep, sweep_x, sweep_y))
+        st.download_button(
+            "📥 격자 결과 CSV 다운로드",
+            data=sweep.to_csv(index=False).encode("utf-8-sig"),
+            file_name="wetwipe_sweep.csv",
+            mime="text/csv"
+        )
+    with tab_tornado:
+        tornado, tornado_base_price = stage_timer.timed("sweep", tornado_wetwipe_cost, sweep_base, sweep_ranges, **sweep_items)
+        st.vega_lite_chart(stage_timer.timed("sweep_charts", tornado_chart_spec, tornado, tornado_base_price))
+        st.dataframe(tornado)
+    with tab_monte_carlo:
+        sweep_samples_count = st.number_input("표본 수", min_value=1000, max_value=200000, value=10000, step=1000)
+        sweep_samples = stage_timer.timed(
+            "sweep", sample_wetwipe_cost, sweep_base, sweep_ranges, n_samples=int(sweep_samples_count), seed=0, **sweep_items
+        )
+        st.vega_lite_chart(stage_timer.timed("sweep_charts", price_histogram_spec, sweep_samples))
+        st.dataframe(
+            sweep_samples[SWEEP_RESULT_COLUMNS].quantile([0.05, 0.25, 0.5, 0.75, 0.95]).rename(index=lambda q: f"{int(q * 100)}%")
+        )
+
+    if st.button("닫기", key="close_sweep"):
+        st.session_state.show_sweep = False
+        st.rerun()
+
+# 목표 제안가 역산: 현재 입력값에서 하나만 바꿔서 목표 제안가가 되는 값을 찾음 (목표 여러 개를 한 번에)
+if st.session_state.get('show_solve', False):
+    st.subheader("🎯 목표 제안가 역산")
+    col_solve1, col_solve2, col_solve3 = st.columns(3)
+    with col_solve1:
+        solve_variable = st.selectbox(
+            "바꿀 입력값", list(SOLVE_VARIABLES), format_func=lambda name: SOLVE_VARIABLES[name][0]
+        )
+    solve_label, (solve_low, solve_high), solve_integer = SOLVE_VARIABLES[solve_variable]
+    with col_solve2:
+        solve_low = st.number_input("최소", value=float(solve_low), key=f"solve_low_{solve_variable}")
+    with col_solve3:
+        solve_high = st.number_input("최대", value=float(solve_high), key=f"solve_high_{solve_variable}")
+    current_price = calculate_wetwipe_cost(**form_inputs, **form_items)[5]
+    st.caption(
+        f"현재 {solve_label}: {form_inputs[solve_variable]:,.4g}, 현재 제안가: {current_price:,.2f} 원 "
+        "(나머지 입력값은 계산기 값 그대로 사용)"
+    )
+
+    solve_targets = st.data_editor(
+        pd.DataFrame({"목표 제안가": pd.Series([round(current_price * rate, -1) for rate in (0.9, 1.0, 1.1)], dtype=float)}),
+        num_rows="dynamic",
+        hide_index=True,
+        column_config={"목표 제안가": st.column_config.NumberColumn(format="%.2f")}
+    )["목표 제안가"].dropna()
+    if solve_low >= solve_high:
+        st.error("최소가 최대보다 작아야 합니다.")
+    elif not solve_targets.empty:
+        solve_started = time.perf_counter()
+        solved = stage_timer.timed(
+            "solve", solve_wetwipe_cost, form_inputs, solve_variable, solve_targets.to_numpy(),
+            bounds=(solve_low, solve_high), **form_items
+        )
+        st.dataframe(solved, hide_index=True, column_config={solve_label: st.column_config.NumberColumn(format="%.4f")})
+        st.caption(f"{len(solved):,}건, {(time.perf_counter() - solve_started) * 1000:,.1f} ms")
+        if (solved["상태"] == "범위 밖").any():
+            st.warning("범위 밖: 최소~최대 범위 안에서는 목표 제안가에 닿지 않습니다. 범위를 넓혀 보세요.")
+        st.download_button(
+            "📥 역산 결과 CSV 다운로드",
+            data=solved.to_csv(index=False).encode("utf-8-sig"),
+            file_name="wetwipe_solve.csv",
+            mime="text/csv"
+        )
+
+    if st.button("닫기", key="close_solve"):
+        st.session_state.show_solve = False
+        st.rerun()
+
+# 이번 실행 전체 시간 기록, 디버그 모드면 단계별 처리 시간 표시
+stage_timer.record("script_run", time.perf_counter() - run_started)
+if DEBUG_PANEL:
+    with st.sidebar.expander("🛠 처리 시간", expanded=True):
+        st.dataframe(pd.DataFrame(stage_timer.summary()), hide_index=True)
+        st.download_button(
+            "📄 Prometheus 형식으로 받기",
+            data=stage_timer.prometheus_text(),
+            file_name="wetwipe_metrics.txt",
+            mime="text/plain"
+        )
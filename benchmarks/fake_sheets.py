@@ -0,0 +1,86 @@
+# 벤치마크용 Google Sheets 대역
+# gspread Worksheet 중 앱이 쓰는 메서드만 메모리에서 흉내냄 (값은 시트처럼 문자열로 저장)
+import re
+import time
+from collections import Counter
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value != value:  # NaN
+        return ""
+    return str(value)
+
+
+def _column_index(letters):
+    # A1 형식 열 이름 -> 0부터 세는 열 번호
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+class FakeWorksheet:
+    def __init__(self, latency=0.0):
+        # latency: API 요청 한 번마다 기다릴 시간 (초), 실제 Sheets 왕복 시간을 흉내낼 때 사용
+        self.latency = latency
+        self.rows = []
+        self.calls = Counter()
+
+    def _request(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def row_values(self, row):
+        self._request("row_values")
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def col_values(self, col):
+        self._request("col_values")
+        return [row[col - 1] if col <= len(row) else "" for row in self.rows]
+
+    def batch_get(self, ranges):
+        # "B2:B", "A1:C3" 같은 범위만 지원, 실제 API 처럼 범위 끝의 빈 칸/빈 행은 잘라서 반환
+        self._request("batch_get")
+        result = []
+        for range_name in ranges:
+            match = re.fullmatch(r"([A-Z]+)(\d+):([A-Z]+)(\d*)", range_name)
+            first, last = _column_index(match.group(1)), _column_index(match.group(3))
+            start = int(match.group(2)) - 1
+            end = int(match.group(4)) if match.group(4) else len(self.rows)
+            values = []
+            for row in self.rows[start:end]:
+                cells = row[first:last + 1]
+                while cells and cells[-1] == "":
+                    cells.pop()
+                values.append(cells)
+            while values and not values[-1]:
+                values.pop()
+            result.append(values)
+        return result
+
+    def insert_row(self, values, index=1):
+        self._request("insert_row")
+        self.rows.insert(index - 1, [_cell_text(value) for value in values])
+
+    def update(self, values, range_name="A1"):
+        # A1 형식 시작 셀만 지원 (A열부터 채움)
+        self._request("update")
+        start = int(re.fullmatch(r"[A-Z]+(\d+)", range_name).group(1)) - 1
+        for offset, values_row in enumerate(values):
+            while len(self.rows) <= start + offset:
+                self.rows.append([])
+            row = self.rows[start + offset]
+            row.extend([""] * (len(values_row) - len(row)))
+            row[:len(values_row)] = [_cell_text(value) for value in values_row]
+
+    def append_rows(self, values):
+        self._request("append_rows")
+        self.rows.extend([_cell_text(value) for value in row] for row in values)
+
+    def get_all_values(self):
+        self._request("get_all_values")
+        width = max((len(row) for row in self.rows), default=0)
+        return [row + [""] * (width - len(row)) for row in self.rows]
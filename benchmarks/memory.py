@@ -0,0 +1,97 @@
+# 재실행 반복 시 메모리(RSS) 증가 확인
+# 계산하기를 입력값을 바꿔 가며 여러 번 실행하고, 워밍업 이후 RSS 가 계속 늘어나지 않는지 확인
+# (차트 figure 를 닫지 않는 등 재실행마다 메모리가 쌓이는 문제를 잡기 위한 회귀 검사)
+#
+# 사용법:
+#   python benchmarks/memory.py                          # 1,000회, 워밍업 이후 20MB 넘게 늘면 종료 코드 1
+#   python benchmarks/memory.py --reruns 200 --output memory.json
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def current_rss_mb():
+    # 현재 RSS (리눅스는 /proc, 그 외에는 최대 RSS 로 대신함)
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(app_path, reruns, warmup, sample_every):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.run()
+    width_input = next(i for i, w in enumerate(at.number_input) if w.label.startswith("원단 가로길이"))
+
+    samples = []
+    start = time.perf_counter()
+    for i in range(reruns):
+        # 매번 다른 입력값으로 계산 (결과/차트 캐시에 걸리지 않게)
+        at.number_input[width_input].set_value(100 + i % 200)
+        next(b for b in at.button if "계산하기" in str(b.label)).click().run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        if i + 1 == warmup or (i + 1) % sample_every == 0 or i + 1 == reruns:
+            samples.append({"rerun": i + 1, "rss_mb": round(current_rss_mb(), 2)})
+    elapsed = time.perf_counter() - start
+
+    after_warmup = [s["rss_mb"] for s in samples if s["rerun"] >= warmup]
+    return {
+        "reruns": reruns,
+        "warmup": warmup,
+        "seconds": round(elapsed, 2),
+        "rss_after_warmup_mb": after_warmup[0],
+        "rss_final_mb": after_warmup[-1],
+        "rss_growth_mb": round(after_warmup[-1] - after_warmup[0], 2),
+        "samples": samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="물티슈 원가계산기 재실행 메모리 검사")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--sample-every", type=int, default=50)
+    parser.add_argument("--max-growth-mb", type=float, default=20.0,
+                        help="워밍업 이후 허용할 RSS 증가량")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # 로컬 저장소 모드, 결과 캐시는 작게 (캐시가 차는 것과 누수를 구분하기 위해)
+        os.environ.update(
+            WETWIPE_STORAGE="sqlite",
+            WETWIPE_DB_PATH=os.path.join(workdir, "estimates.sqlite3"),
+            WETWIPE_SPOOL_PATH=os.path.join(workdir, "spool.sqlite3"),
+            WETWIPE_RESULT_CACHE_MB="1",
+        )
+        sys.path.insert(0, os.path.dirname(os.path.abspath(args.app)))
+        report = measure(args.app, args.reruns, min(args.warmup, args.reruns), args.sample_every)
+
+    report["max_growth_mb"] = args.max_growth_mb
+    report["passed"] = report["rss_growth_mb"] <= args.max_growth_mb
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if not report["passed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# 앱 콜드 스타트 측정
+# 매번 새 프로세스에서 첫 화면을 렌더링하는 시간과, 그 사이에 불러온 무거운 모듈을 기록
+#
+# 사용법:
+#   python benchmarks/startup.py                 # 현재 app.py
+#   python benchmarks/startup.py --app old/app.py --runs 10 --output startup.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 기능을 쓰기 전에는 불러오지 않아야 하는 모듈
+HEAVY_MODULES = ["matplotlib", "matplotlib.pyplot", "reportlab", "xlsxwriter", "gspread", "google.oauth2", "google.auth.transport.requests"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "errors": [str(e.value) for e in at.exception],
+    "loaded": [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+
+def measure(app_path, runs):
+    samples = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # 로컬 저장소 모드로 실행해서 Google Sheets 나 작업 디렉터리를 건드리지 않음
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.path.dirname(os.path.abspath(app_path)),
+            WETWIPE_STORAGE="sqlite",
+            WETWIPE_DB_PATH=os.path.join(workdir, "estimates.sqlite3"),
+            WETWIPE_SPOOL_PATH=os.path.join(workdir, "spool.sqlite3"),
+        )
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, "-c", PROBE, os.path.abspath(app_path), *HEAVY_MODULES],
+                cwd=workdir, env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    seconds = [sample["seconds"] for sample in samples]
+    return {
+        "app": app_path,
+        "runs": runs,
+        "median_seconds": round(statistics.median(seconds), 4),
+        "min_seconds": round(min(seconds), 4),
+        "max_seconds": round(max(seconds), 4),
+        "loaded_heavy_modules": samples[-1]["loaded"],
+        "errors": samples[-1]["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="물티슈 원가계산기 콜드 스타트 측정")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    report = measure(args.app, args.runs)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# 원가 계산, 견적 저장소, 내보내기 벤치마크
+# Google Sheets 대신 메모리 대역(FakeWorksheet)을 쓰므로 네트워크/인증 없이 재현 가능
+#
+# 사용법:
+#   python benchmarks/suite.py --output bench.json                 # 전체 (이력 1k/10k/100k 행)
+#   python benchmarks/suite.py --quick                              # 작은 크기로 빠르게
+#   python benchmarks/suite.py --only core storage                  # 일부만
+#   python benchmarks/suite.py --baseline bench.json --tolerance 0.25   # 기준보다 25% 넘게 느려지면 종료 코드 1
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.fake_sheets import FakeWorksheet  # noqa: E402
+from estimate_queue import EstimateWriteQueue  # noqa: E402
+from estimate_store import (  # noqa: E402
+    ESTIMATE_HEADERS, ESTIMATE_ID_FIELD, ESTIMATE_LIST_COLUMNS, ESTIMATE_TEXT_FIELDS, SAVED_AT_FIELD,
+    SheetsEstimateStore, SQLiteEstimateStore, estimate_versions, new_estimate_rows, query_estimate_table,
+    restore_estimate
+)
+from price_history import FABRIC_PRICE_ITEM, PriceHistory, requote_estimates  # noqa: E402
+from wetwipe_cost import (  # noqa: E402
+    DEFAULT_OTHER_COSTS, DEFAULT_PROCESSING_COSTS, DEFAULT_SUBMATERIALS, IncrementalCost, calculate_wetwipe_cost,
+    calculate_wetwipe_cost_batch, solve_wetwipe_cost
+)
+from wetwipe_report import (  # noqa: E402
+    build_bulk_excel, build_bulk_pdf, build_result_excel, build_result_pdf, bulk_estimate_records, compare_estimates,
+    estimate_cost_breakdown, write_bulk_pdf, write_estimate_history_excel
+)
+
+BASE_QUOTE = {
+    "width_mm": 150, "height_mm": 195, "gsm": 40, "exchange_rate": 1500,
+    "percent_applied": 1.2, "quantity_per_unit": 120,
+}
+
+FULL_SIZES = {"batch": [1000, 10000, 100000], "history": [1000, 10000, 100000], "bulk_export": [100, 1000]}
+QUICK_SIZES = {"batch": [1000, 10000], "history": [1000, 10000], "bulk_export": [100]}
+
+
+def time_calls(fn, repeat):
+    # 첫 호출(지연 import, 폰트 등록 등)은 따로 빼고 측정
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples, **extra):
+    ordered = sorted(samples)
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+        **extra,
+    }
+
+
+def sample_inputs(n, seed=0):
+    # 실제 견적과 비슷한 범위의 입력값 n 건
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "견적명": [f"견적 {i}" for i in range(n)],
+        "width_mm": rng.integers(120, 220, n).astype(float),
+        "height_mm": rng.integers(150, 250, n).astype(float),
+        "gsm": rng.integers(30, 70, n).astype(float),
+        "quantity_per_unit": rng.choice([10, 20, 70, 80, 100, 120], n).astype(float),
+        "exchange_rate": rng.uniform(1300, 1600, n).round(2),
+        "percent_applied": rng.uniform(1.0, 1.4, n).round(2),
+    })
+
+
+def sample_rows(n):
+    # 앱의 save_estimates 와 같은 방식으로 만든 견적 로그 행
+    inputs = sample_inputs(n)
+    results = calculate_wetwipe_cost_batch(inputs.drop(columns="견적명"))
+    base = datetime.datetime(2024, 1, 1)
+    return [
+        [row.get(header, "") for header in ESTIMATE_HEADERS]
+        for i, record in enumerate(bulk_estimate_records(inputs, results))
+        for row in new_estimate_rows([record], (base + datetime.timedelta(minutes=i)).isoformat(timespec="seconds"))
+    ]
+
+
+def fresh_rows(row):
+    # 저장할 때마다 내용이 다른 견적 (견적명만 바꿈, 중복 저장으로 건너뛰지 않게)
+    record = dict(zip(ESTIMATE_HEADERS, row))
+    for i in itertools.count():
+        yield new_estimate_rows([{**record, "견적명": f"새 견적 {i}"}], record[SAVED_AT_FIELD])[0]
+
+
+def bench_core(sizes, repeat):
+    report = {}
+    single = time_calls(lambda: calculate_wetwipe_cost(**BASE_QUOTE), max(repeat * 200, 1000))
+    report["core.single_quote"] = summarize(single)
+
+    # 실시간 미리보기: 원부자재 하나만 바꿔 가며 증분 계산
+    preview = IncrementalCost()
+    preview_inputs = dict(
+        BASE_QUOTE, margin_rate=0.1, usd_price_per_kg=1.46, corporate_profit=100, submaterials=dict(DEFAULT_SUBMATERIALS),
+        processing_costs=dict(DEFAULT_PROCESSING_COSTS), other_costs=dict(DEFAULT_OTHER_COSTS)
+    )
+    edits = itertools.count()
+
+    def edit_submaterial():
+        preview_inputs["submaterials"] = dict(preview_inputs["submaterials"], 정제수=next(edits) % 100 / 10)
+        preview.update(**preview_inputs)
+
+    report["core.preview_update"] = summarize(time_calls(edit_submaterial, max(repeat * 200, 1000)))
+    for n in sizes["batch"]:
+        inputs = sample_inputs(n).drop(columns="견적명")
+        samples = time_calls(lambda: calculate_wetwipe_cost_batch(inputs), repeat)
+        report[f"core.batch.{n}"] = summarize(samples, rows_per_second=round(n / statistics.median(samples)))
+
+        # 목표 제안가 n 개를 평량(실수)/매수(정수)로 역산
+        targets = np.linspace(700, 1200, n)
+        for variable in ("gsm", "quantity_per_unit"):
+            samples = time_calls(lambda: solve_wetwipe_cost(BASE_QUOTE, variable, targets), repeat)
+            report[f"core.solve.{variable}.{n}"] = summarize(samples, rows_per_second=round(n / statistics.median(samples)))
+
+    # 저장된 견적을 견적별 저장일 단가로 재계산 (항목마다 월별 단가 이력 3년치)
+    history = PriceHistory(
+        (item, datetime.date(2022 + month // 12, month % 12 + 1, 1), 1.0 + month / 100)
+        for item in (FABRIC_PRICE_ITEM, "SPC팩(파우치)", "지피엠(박스)", "노무비")
+        for month in range(36)
+    )
+    for n in sizes["history"]:
+        table = pd.DataFrame(sample_rows(n), columns=ESTIMATE_HEADERS)
+        samples = time_calls(lambda: requote_estimates(table, history), repeat)
+        report[f"core.requote.{n}"] = summarize(samples, rows_per_second=round(n / statistics.median(samples)))
+        samples = time_calls(lambda: compare_estimates(estimate_cost_breakdown(table), table.index[0]), repeat)
+        report[f"core.compare.{n}"] = summarize(samples, rows_per_second=round(n / statistics.median(samples)))
+    return report
+
+
+def bench_storage(sizes, repeat, workdir, latency):
+    report = {}
+    for n in sizes["history"]:
+        rows = sample_rows(n)
+        # 저장은 새 내용의 견적, 중복 저장은 이미 있는 견적을 다시 저장 (내용 해시로 건너뜀)
+        new_rows = fresh_rows(rows[-1])
+        duplicate_row = rows[-1]
+
+        # Google Sheets (메모리 대역): 저장은 스풀 큐를 거쳐서 한 번에 보냄
+        sheet = FakeWorksheet(latency=latency)
+        sheets_store = SheetsEstimateStore(lambda operation: operation(sheet), ESTIMATE_HEADERS, ESTIMATE_TEXT_FIELDS)
+        sheets_store.append_rows(rows)
+        queue = EstimateWriteQueue(sheets_store.append_rows, os.path.join(workdir, f"spool-{n}.sqlite3"))
+        report[f"storage.sheets.{n}.save"] = summarize(time_calls(lambda: queue.put(next(new_rows)), repeat))
+        report[f"storage.sheets.{n}.save_and_flush"] = summarize(time_calls(
+            lambda: (queue.put(next(new_rows)), queue.flush()), repeat))
+        report[f"storage.sheets.{n}.save_duplicate_and_flush"] = summarize(time_calls(
+            lambda: (queue.put(duplicate_row), queue.flush()), repeat))
+        report[f"storage.sheets.{n}.load_table"] = summarize(time_calls(sheets_store.load_table, repeat))
+        table = sheets_store.load_table()
+        report[f"storage.sheets.{n}.list_page"] = summarize(time_calls(
+            lambda: query_estimate_table(table, name="견적 9", columns=ESTIMATE_LIST_COLUMNS, limit=50), repeat))
+        # 앱의 load_estimate 와 같은 경로 (그 행만 시트에서 새로 읽기, 버전 확인, 숫자 변환)
+        key = table.index[n // 2]
+        version = estimate_versions(table.loc[[key]])[key]
+        report[f"storage.sheets.{n}.load_estimate"] = summarize(time_calls(
+            lambda: restore_estimate(sheets_store.get_row(table.loc[key, ESTIMATE_ID_FIELD]), version), repeat))
+
+        # 로컬 SQLite
+        local_store = SQLiteEstimateStore(os.path.join(workdir, f"estimates-{n}.sqlite3"), ESTIMATE_HEADERS, ESTIMATE_TEXT_FIELDS)
+        local_store.append_rows(rows)
+        report[f"storage.sqlite.{n}.save"] = summarize(time_calls(lambda: local_store.append_rows([next(new_rows)]), repeat))
+        report[f"storage.sqlite.{n}.save_duplicate"] = summarize(time_calls(
+            lambda: local_store.append_rows([duplicate_row]), repeat))
+        report[f"storage.sqlite.{n}.load_table"] = summarize(time_calls(local_store.load_table, repeat))
+        report[f"storage.sqlite.{n}.list_page"] = summarize(time_calls(
+            lambda: local_store.query(name="견적 9", columns=ESTIMATE_LIST_COLUMNS, limit=50), repeat))
+        version = estimate_versions(local_store.query(offset=n // 2 - 1, limit=1)[0])[n // 2]
+        report[f"storage.sqlite.{n}.load_estimate"] = summarize(time_calls(
+            lambda: restore_estimate(local_store.get_row(n // 2), version), repeat))
+        report[f"storage.sqlite.{n}.history_excel"] = summarize(time_calls(
+            lambda: write_estimate_history_excel(local_store.iter_rows(), os.path.join(workdir, "history.xlsx")), repeat))
+    return report
+
+
+def bench_exports(sizes, repeat, workdir):
+    report = {}
+    result, *_ = calculate_wetwipe_cost(**BASE_QUOTE)
+    report["export.result_pdf"] = summarize(time_calls(lambda: build_result_pdf(result), repeat))
+    report["export.result_excel"] = summarize(time_calls(lambda: build_result_excel(result), repeat))
+    for n in sizes["bulk_export"]:
+        inputs = sample_inputs(n)
+        results = calculate_wetwipe_cost_batch(inputs.drop(columns="견적명"))
+        report[f"export.bulk_excel.{n}"] = summarize(time_calls(lambda: build_bulk_excel(inputs, results), repeat))
+        report[f"export.bulk_pdf.{n}"] = summarize(time_calls(lambda: build_bulk_pdf(inputs, results), repeat))
+        report[f"export.bulk_pdf_file.{n}"] = summarize(time_calls(
+            lambda: write_bulk_pdf(inputs, results, os.path.join(workdir, "bulk.pdf")), repeat))
+    return report
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, tolerance):
+    # 중앙값이 기준보다 tolerance 비율 넘게 늘어난 항목
+    regressions = []
+    for name, stats in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before and before["median_ms"] > 0 and stats["median_ms"] > before["median_ms"] * (1 + tolerance):
+            regressions.append({
+                "benchmark": name,
+                "baseline_ms": before["median_ms"],
+                "median_ms": stats["median_ms"],
+                "ratio": round(stats["median_ms"] / before["median_ms"], 3),
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="물티슈 원가계산기 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="작은 크기로 빠르게 실행")
+    parser.add_argument("--only", nargs="+", choices=["core", "storage", "exports"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sheets-latency", type=float, default=0.0,
+                        help="Sheets 대역의 요청당 지연 (초)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else FULL_SIZES
+    groups = args.only or ["core", "storage", "exports"]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        if "core" in groups:
+            results.update(bench_core(sizes, args.repeat))
+        if "storage" in groups:
+            results.update(bench_storage(sizes, args.repeat, workdir, args.sheets_latency))
+        if "exports" in groups:
+            results.update(bench_exports(sizes, args.repeat, workdir))
+
+    report = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
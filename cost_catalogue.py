@@ -0,0 +1,57 @@
+# 원가 항목 목록 (cost_items.toml)
+# 파일은 경로별로 한 번만 읽어서 캐시, 계산/폼/견적 로그 컬럼/내보내기가 같은 목록을 사용
+import functools
+import os
+import tomllib
+
+DEFAULT_CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cost_items.toml")
+
+# 항목 그룹 (calculate_wetwipe_cost 인자명과 같음)
+ITEM_GROUPS = ("submaterials", "processing_costs", "other_costs")
+
+
+class CostCatalogue:
+    def __init__(self, submaterials, processing_costs, other_costs, params):
+        # 그룹별 항목명 -> 기본 단가 (파일에 적힌 순서 유지)
+        self.submaterials = submaterials
+        self.processing_costs = processing_costs
+        self.other_costs = other_costs
+        # 항목명 -> calculate_wetwipe_cost 인자명
+        self.params = params
+
+    def items(self, group):
+        return getattr(self, group)
+
+    def item_names(self):
+        # 견적 로그에 컬럼으로 저장하는 항목 (기타 비용은 이름이 바뀔 수 있어서 제외)
+        return [*self.submaterials, *self.processing_costs]
+
+
+def _parse_group(entries, group, path):
+    items = {}
+    for entry in entries:
+        name = str(entry.get("name", "")).strip()
+        if not name:
+            raise ValueError(f"{path}: {group} 항목에 name 이 없습니다.")
+        if name in items:
+            raise ValueError(f"{path}: {group} 항목 '{name}' 이 중복되었습니다.")
+        items[name] = float(entry.get("default", 0.0))
+    return items
+
+
+@functools.lru_cache(maxsize=None)
+def load_cost_catalogue(path=None):
+    path = path or os.environ.get("WETWIPE_COST_ITEMS") or DEFAULT_CATALOGUE_PATH
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+
+    groups = {group: _parse_group(config.get(group, []), group, path) for group in ITEM_GROUPS}
+    duplicated = set(groups["submaterials"]) & set(groups["processing_costs"])
+    if duplicated:
+        raise ValueError(f"{path}: 원부자재와 임가공비에 같은 항목이 있습니다: {', '.join(sorted(duplicated))}")
+    params = {
+        str(entry["name"]).strip(): entry["param"]
+        for entry in config.get("processing_costs", [])
+        if entry.get("param")
+    }
+    return CostCatalogue(params=params, **groups)
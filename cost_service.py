@@ -0,0 +1,296 @@
+# 물티슈 원가 계산 HTTP/CLI 서비스
+# Streamlit 앱을 거치지 않고 wetwipe_cost 의 계산 로직을 바로 사용 (Google Sheets 에 접근하지 않음)
+#
+# 사용법:
+#   python cost_service.py serve --port 8502 --workers 8
+#   echo '{"width_mm": 150, "height_mm": 195, "gsm": 40, "exchange_rate": 1500,
+#          "percent_applied": 1.2, "quantity_per_unit": 120}' | python cost_service.py quote
+#   python cost_service.py price-table skus.csv -o priced.csv --exchange-rate 1500 --percent-applied 1.2
+#   python cost_service.py price-table skus.csv --pdf quotes.pdf     # 견적서 PDF (견적이 많아도 조각씩 파일에 씀)
+#
+# HTTP:
+#   POST /quote   JSON 객체 하나는 단일 견적, JSON 배열 또는 {"items": [...]} 는 여러 견적
+#                 exchange_rate 를 빼면 캐시된 환율을 쓰고 응답의 fx 에 환율 기준을 표시 (fx_rates.py)
+#   GET  /health  상태와 현재 환율
+#   GET  /metrics  단계별 처리 시간 (Prometheus 텍스트 형식)
+import argparse
+import functools
+import inspect
+import json
+import logging
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pandas as pd
+
+from cost_catalogue import ITEM_GROUPS
+from fx_rates import cached_rate_provider_from_env
+from stage_timer import StageTimer
+from wetwipe_report import write_bulk_pdf
+from wetwipe_cost import batch_row_summary, calculate_wetwipe_cost, calculate_wetwipe_cost_batch, prepare_bulk_inputs
+
+logger = logging.getLogger(__name__)
+
+QUOTE_PARAMETERS = inspect.signature(calculate_wetwipe_cost).parameters
+# exchange_rate 는 없으면 캐시된 환율로 채움
+QUOTE_REQUIRED = [
+    name for name, param in QUOTE_PARAMETERS.items()
+    if param.default is inspect.Parameter.empty and name != "exchange_rate"
+]
+
+# 요청 본문 최대 크기 (바이트)
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+# 서비스 전체에서 공유하는 단계별 처리 시간
+stage_timer = StageTimer()
+
+
+# 환율 (처음 쓸 때 만들고 서비스 전체에서 공유)
+@functools.lru_cache(maxsize=None)
+def get_fx_rates():
+    return cached_rate_provider_from_env()
+
+
+def fx_status():
+    fx_rates = get_fx_rates()
+    return fx_rates.current().as_dict(fx_rates.max_age)
+
+
+class QuoteError(ValueError):
+    pass
+
+
+def _is_number(value):
+    # JSON 의 NaN/Infinity 는 숫자로 보지 않음 (결과에 그대로 퍼져서 응답이 JSON 이 아니게 됨)
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _check_result(response):
+    # 입력값이 유한해도 0 으로 나누는 등으로 결과가 유한하지 않으면 요청 오류
+    values = [*response["cost_summary"].values(), response["fabric_unit_price_per_sheet"]]
+    if not all(math.isfinite(value) for value in values):
+        raise QuoteError("계산 결과가 올바른 숫자가 아닙니다. 입력값을 확인하세요.")
+    return response
+
+
+def check_quote_params(params):
+    if not isinstance(params, dict):
+        raise QuoteError("견적 요청은 JSON 객체여야 합니다.")
+    missing = [name for name in QUOTE_REQUIRED if name not in params]
+    if missing:
+        raise QuoteError("필수 입력값이 없습니다: {}".format(", ".join(missing)))
+    unknown = [name for name in params if name not in QUOTE_PARAMETERS]
+    if unknown:
+        raise QuoteError("알 수 없는 입력값입니다: {}".format(", ".join(unknown)))
+    for name, value in params.items():
+        if name in ITEM_GROUPS:
+            if value is not None and not (
+                isinstance(value, dict) and all(_is_number(cost) for cost in value.values())
+            ):
+                raise QuoteError(f"{name} 는 항목명 -> 금액 객체여야 합니다.")
+        elif not _is_number(value):
+            raise QuoteError(f"{name} 는 유한한 숫자여야 합니다.")
+
+
+def quote(params):
+    # 단일 견적
+    check_quote_params(params)
+    fx = None
+    if "exchange_rate" not in params:
+        fx = fx_status()
+        params = {**params, "exchange_rate": fx["rate"]}
+    cost_summary, fabric_unit_price_per_sheet, *_ = stage_timer.timed("calculate", calculate_wetwipe_cost, **params)
+    response = _check_result({"cost_summary": cost_summary, "fabric_unit_price_per_sheet": fabric_unit_price_per_sheet})
+    if fx is not None:
+        response["fx"] = fx
+    return response
+
+
+def quote_many(items):
+    # 여러 견적: 항목별 비용 구성을 따로 넘기지 않으면 한 번에 벡터 계산 (결과는 단일 견적과 동일)
+    if not isinstance(items, list):
+        raise QuoteError("items 는 JSON 배열이어야 합니다.")
+    for params in items:
+        check_quote_params(params)
+    if not items:
+        return []
+    if any(group in params for params in items for group in ITEM_GROUPS):
+        return [quote(params) for params in items]
+
+    # 일부 견적에만 있는 선택 입력값은 빈 값이 되고, 배치 계산에서 기본값으로 채움
+    inputs = pd.DataFrame(items)
+    fx = None
+    without_rate = [i for i, params in enumerate(items) if "exchange_rate" not in params]
+    if without_rate:
+        fx = fx_status()
+        inputs["exchange_rate"] = inputs.get("exchange_rate", pd.Series(index=inputs.index, dtype=float)).fillna(fx["rate"])
+    results = stage_timer.timed("batch_calculate", calculate_wetwipe_cost_batch, inputs)
+    responses = [
+        _check_result({"cost_summary": batch_row_summary(row), "fabric_unit_price_per_sheet": row["원단 단가(1장당)"]})
+        for row in results.to_dict("records")
+    ]
+    for i in without_rate:
+        responses[i]["fx"] = fx
+    return responses
+
+
+def handle_payload(payload):
+    if isinstance(payload, list):
+        return {"items": quote_many(payload)}
+    if isinstance(payload, dict) and "items" in payload:
+        return {"items": quote_many(payload["items"])}
+    return quote(payload)
+
+
+class QuoteRequestHandler(BaseHTTPRequestHandler):
+    server_version = "WetwipeCostService/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "fx": fx_status()})
+        elif self.path == "/metrics":
+            data = stage_timer.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/quote":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send_json(413, {"error": "요청이 너무 큽니다."})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self._send_json(400, {"error": "JSON 형식이 올바르지 않습니다."})
+            return
+        try:
+            with stage_timer.stage("request"):
+                body = handle_payload(payload)
+        except QuoteError as e:
+            self._send_json(400, {"error": str(e)})
+        else:
+            self._send_json(200, body)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class PooledHTTPServer(HTTPServer):
+    # 연결을 정해진 수의 워커 스레드에서 처리 (요청마다 스레드를 새로 만들지 않음)
+    def __init__(self, server_address, handler_class, workers=8):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quote-worker")
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_in_worker, request, client_address)
+
+    def _process_request_in_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def serve(host="127.0.0.1", port=8502, workers=8):
+    server = PooledHTTPServer((host, port), QuoteRequestHandler, workers=workers)
+    logger.info("물티슈 원가 계산 서비스 시작: http://%s:%d (워커 %d개)", host, port, workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def price_table(path, defaults):
+    # 대량 견적 양식(CSV/XLSX)을 읽어서 입력값과 계산 결과 반환
+    table = pd.read_excel(path) if str(path).lower().endswith(".xlsx") else pd.read_csv(path, encoding="utf-8-sig")
+    inputs = prepare_bulk_inputs(table, defaults)
+    return inputs, calculate_wetwipe_cost_batch(inputs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="물티슈 원가 계산 서비스")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="JSON HTTP 서비스 실행")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8502)
+    serve_parser.add_argument("--workers", type=int, default=8)
+
+    quote_parser = commands.add_parser("quote", help="JSON 견적 요청을 계산해서 JSON 으로 출력")
+    quote_parser.add_argument("input", nargs="?", help="요청 JSON 파일 (없으면 표준 입력)")
+
+    table_parser = commands.add_parser("price-table", help="대량 견적 양식(CSV/XLSX)을 계산해서 CSV 로 출력")
+    table_parser.add_argument("input")
+    table_parser.add_argument("-o", "--output", help="결과 CSV 파일 (없으면 표준 출력)")
+    table_parser.add_argument("--pdf", help="견적서 PDF 파일 (견적마다 한 페이지)")
+    for name in ("gsm", "quantity_per_unit", "exchange_rate", "percent_applied", "margin_rate",
+                 "usd_price_per_kg", "corporate_profit"):
+        table_parser.add_argument("--" + name.replace("_", "-"), dest=name, type=float,
+                                  help="파일에 컬럼이 없을 때 쓸 값")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers)
+    elif args.command == "quote":
+        if args.input:
+            with open(args.input, encoding="utf-8") as f:
+                payload = json.load(f)
+        else:
+            payload = json.load(sys.stdin)
+        try:
+            json.dump(handle_payload(payload), sys.stdout, ensure_ascii=False, indent=2, allow_nan=False)
+            sys.stdout.write("\n")
+        except QuoteError as e:
+            parser.exit(1, f"오류: {e}\n")
+    elif args.command == "price-table":
+        defaults = {
+            name: getattr(args, name)
+            for name in ("gsm", "quantity_per_unit", "exchange_rate", "percent_applied", "margin_rate",
+                         "usd_price_per_kg", "corporate_profit")
+            if getattr(args, name) is not None
+        }
+        # 환율 컬럼도 --exchange-rate 도 없으면 캐시된 환율
+        defaults.setdefault("exchange_rate", get_fx_rates().current().rate)
+        try:
+            inputs, results = price_table(args.input, defaults)
+        except (KeyError, ValueError) as e:
+            parser.exit(1, f"오류: {e}\n")
+        if args.pdf:
+            write_bulk_pdf(inputs, results, args.pdf)
+        # --pdf 만 지정하면 CSV 는 출력하지 않음
+        if args.output or not args.pdf:
+            pd.concat([inputs, results], axis=1).to_csv(args.output or sys.stdout, index=False,
+                                                        encoding="utf-8-sig" if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# 견적 저장용 write-behind 큐
+# 저장 요청은 로컬 SQLite 스풀에 먼저 기록하고, 백그라운드 스레드가 모아서 한 번에 시트로 보냄
+import json
+import logging
+import random
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(error):
+    # Google Sheets 할당량 초과(429) 여부
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+class EstimateWriteQueue:
+    def __init__(self, flush_rows, spool_path, batch_size=500, flush_interval=2.0,
+                 initial_backoff=1.0, max_backoff=60.0):
+        # flush_rows: 행 리스트를 받아 원격 저장소에 한 번에 쓰는 함수 (실패 시 예외)
+        self.flush_rows = flush_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._backoff = 0.0
+
+        self._conn = sqlite3.connect(spool_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending_rows ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, row TEXT NOT NULL)"
+            )
+
+    def put(self, row):
+        self.put_many([row])
+
+    def put_many(self, rows):
+        # 스풀에 기록된 뒤에 반환하므로 프로세스가 재시작돼도 행이 유실되지 않음
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO pending_rows (row) VALUES (?)",
+                [(json.dumps(row if isinstance(row, dict) else list(row), ensure_ascii=False, default=str),) for row in rows],
+            )
+
+    def pending(self):
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM pending_rows").fetchone()
+        return count
+
+    def flush_once(self):
+        # 대기 중인 행을 최대 batch_size개 보내고, 성공하면 스풀에서 삭제
+        # 반환: 보낸 행 수
+        with self._lock:
+            batch = self._conn.execute(
+                "SELECT id, row FROM pending_rows ORDER BY id LIMIT ?", (self.batch_size,)
+            ).fetchall()
+        if not batch:
+            return 0
+
+        self.flush_rows([json.loads(row) for _, row in batch])
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pending_rows WHERE id <= ?", (batch[-1][0],))
+        return len(batch)
+
+    def flush(self):
+        # 스풀이 빌 때까지 보냄
+        total = 0
+        while True:
+            sent = self.flush_once()
+            if not sent:
+                return total
+            total += sent
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="estimate-write-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        # flush_interval 동안 쌓인 행을 한 번에 보냄 (이전 실행에서 남은 행도 첫 주기에 보냄)
+        while not self._stopping.wait(self._backoff or self.flush_interval):
+            try:
+                self.flush()
+                self._backoff = 0.0
+            except Exception as e:
+                # 실패한 행은 스풀에 남겨두고 지수 백오프 후 재시도
+                self._backoff = min(self.max_backoff, max(self.initial_backoff, self._backoff * 2))
+                self._backoff *= random.uniform(0.8, 1.2)
+                if is_rate_limit_error(e):
+                    logger.warning("Sheets 할당량 초과, %.1f초 후 재시도 (대기 %d건)", self._backoff, self.pending())
+                else:
+                    logger.exception("견적 저장 실패, %.1f초 후 재시도", self._backoff)
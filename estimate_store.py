@@ -0,0 +1,542 @@
+# 견적 로그 저장소 백엔드
+# Google Sheets 와 로컬 SQLite 가 같은 방식(행 리스트 쓰기, DataFrame 읽기)으로 동작
+# 견적마다 고정 ID 와 내용 해시를 같이 저장해서
+# - 목록을 본 뒤에 행이 추가/삭제되어도 같은 견적을 찾고 (행 번호 대신 ID)
+# - 대기열이 같은 견적을 다시 보내거나(같은 ID) 같은 내용을 바로 다시 저장하면(중복 제출) 건너뛰고
+# - 불러올 때 목록에서 본 내용과 달라졌으면 알 수 있음 (저장된 해시가 아니라 읽은 값으로 다시 계산해서 비교)
+import datetime
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import uuid
+
+import pandas as pd
+
+# 저장일시 컬럼 (ISO 형식 문자열이라 문자열 비교로 기간 검색 가능)
+SAVED_AT_FIELD = "저장일시"
+
+# 기타 비용 전체 내역 (항목명 -> 금액 JSON, 항목 수 제한 없음)
+OTHER_COSTS_FIELD = "기타비용 내역"
+
+# 원부자재/임가공비 전체 단가 (항목명 -> 단가 JSON)
+# 원가 항목 목록에 항목을 추가해도 컬럼이 늘지 않고 이 칸에만 기록됨
+ITEM_PRICES_FIELD = "항목단가 내역"
+
+# 입력한 원단 가격 ($/kg), 예전 행은 반올림된 기초가격에서 역산해야 해서 재견적 결과가 조금씩 달라짐
+USD_PRICE_FIELD = "원단 가격($/kg)"
+
+# 견적 고정 ID 와 내용 해시 (저장일시/ID 를 뺀 견적 내용의 해시)
+ESTIMATE_ID_FIELD = "견적ID"
+CONTENT_HASH_FIELD = "내용해시"
+
+# 같은 내용을 이 시간 안에 다시 저장하면 중복 제출로 보고 건너뜀
+# (그 뒤에 같은 입력으로 다시 견적을 내면 새 저장일시로 따로 저장)
+DUPLICATE_SAVE_WINDOW = datetime.timedelta(minutes=1)
+
+# 예전 형식의 기타 비용 칸 (앞의 세 항목은 이 칸에도 기록해서 기존 시트와 호환)
+LEGACY_OTHER_COST_SLOTS = 3
+LEGACY_OTHER_COST_NAME_FIELDS = [f"기타비용{i + 1}_이름" for i in range(LEGACY_OTHER_COST_SLOTS)]
+LEGACY_OTHER_COST_VALUE_FIELDS = [f"기타비용{i + 1}" for i in range(LEGACY_OTHER_COST_SLOTS)]
+
+
+# 예전 시트의 원부자재/임가공비 컬럼 (이 항목들은 단가 내역과 함께 계속 컬럼에도 기록해서 기존 시트와 호환)
+LEGACY_ITEM_FIELDS = [
+    "정제수", "명진 메인", "명진 소듐", "명진 인산", "SPC팩(파우치)", "영신피엔엘(캡스티커)", "나우텍(캡)",
+    "영신피엔엘(이너스티커)", "지피엠(박스)",
+    "물류비", "노무비", "4대보험+퇴직금", "제조경비", "이자비용", "창고료"
+]
+
+# 견적 로그 시트 컬럼 (예전 시트의 33개 컬럼 뒤에 새 컬럼이 붙는 순서)
+ESTIMATE_HEADERS = [
+    "견적명", "규격", "평량", "매수", "환율", "관세비율", "총원가", "제안가", "원단 가격", "기초가격",
+    *LEGACY_ITEM_FIELDS,
+    *LEGACY_OTHER_COST_NAME_FIELDS, *LEGACY_OTHER_COST_VALUE_FIELDS,
+    "마진율", "기업이윤", SAVED_AT_FIELD, OTHER_COSTS_FIELD, ESTIMATE_ID_FIELD, CONTENT_HASH_FIELD, ITEM_PRICES_FIELD,
+    USD_PRICE_FIELD
+]
+
+# 숫자로 변환하지 않는 텍스트 컬럼
+ESTIMATE_TEXT_FIELDS = [
+    "견적명", "규격", *LEGACY_OTHER_COST_NAME_FIELDS, SAVED_AT_FIELD, OTHER_COSTS_FIELD, ESTIMATE_ID_FIELD, CONTENT_HASH_FIELD,
+    ITEM_PRICES_FIELD
+]
+
+# 견적 목록에 기본으로 보여줄 컬럼
+ESTIMATE_LIST_COLUMNS = ["견적명", "규격", "평량", "매수", "총원가", "제안가", SAVED_AT_FIELD]
+
+
+def other_cost_fields(other_costs):
+    # 기타 비용을 견적 로그 컬럼 값으로 변환
+    fields = {OTHER_COSTS_FIELD: json.dumps(other_costs, ensure_ascii=False)}
+    names = list(other_costs)[:LEGACY_OTHER_COST_SLOTS]
+    for i, (name_field, value_field) in enumerate(zip(LEGACY_OTHER_COST_NAME_FIELDS, LEGACY_OTHER_COST_VALUE_FIELDS)):
+        fields[name_field] = names[i] if i < len(names) else ""
+        fields[value_field] = other_costs[names[i]] if i < len(names) else ""
+    return fields
+
+
+def parse_other_costs(data):
+    # 견적 로그 한 행의 기타 비용 (내역 컬럼이 없는 예전 행은 기타비용1~3 칸에서 읽음)
+    text = data.get(OTHER_COSTS_FIELD)
+    if isinstance(text, str) and text.strip():
+        try:
+            return {str(name): float(value) for name, value in json.loads(text).items()}
+        except (ValueError, AttributeError, TypeError):
+            pass
+    other_costs = {}
+    for name_field, value_field in zip(LEGACY_OTHER_COST_NAME_FIELDS, LEGACY_OTHER_COST_VALUE_FIELDS):
+        name = data.get(name_field)
+        value = data.get(value_field)
+        if isinstance(name, str) and name.strip():
+            other_costs[name] = 0.0 if value in ("", None) or pd.isna(value) else float(value)
+    return other_costs
+
+
+def item_price_fields(prices):
+    # 원부자재/임가공비 단가(항목명 -> 단가)를 견적 로그 컬럼 값으로 변환
+    fields = {ITEM_PRICES_FIELD: json.dumps(prices, ensure_ascii=False)}
+    for name in LEGACY_ITEM_FIELDS:
+        fields[name] = prices.get(name, "")
+    return fields
+
+
+def parse_item_prices(data):
+    # 견적 로그 한 행의 원부자재/임가공비 단가 (내역 컬럼이 없는 예전 행은 항목별 컬럼에서 읽음)
+    prices = {}
+    for name in LEGACY_ITEM_FIELDS:
+        value = data.get(name)
+        if value in ("", None) or pd.isna(value):
+            continue
+        try:
+            prices[name] = float(value)
+        except (TypeError, ValueError):
+            pass
+    text = data.get(ITEM_PRICES_FIELD)
+    if isinstance(text, str) and text.strip():
+        try:
+            prices.update({str(name): float(value) for name, value in json.loads(text).items()})
+        except (ValueError, AttributeError, TypeError):
+            pass
+    return prices
+
+
+def item_price_table(table, names):
+    # 견적 로그 표의 항목별 단가 (행 = 견적, 컬럼 = names, 저장되지 않은 항목은 NaN)
+    columns = [column for column in (ITEM_PRICES_FIELD, *LEGACY_ITEM_FIELDS) if column in table]
+    return pd.DataFrame(
+        [parse_item_prices(row) for row in table[columns].to_dict("records")],
+        index=table.index, columns=list(names), dtype=float
+    )
+
+
+def estimate_content_hash(row, text_fields=ESTIMATE_TEXT_FIELDS):
+    # 견적 내용(컬럼명 -> 값)의 해시, 저장일시/ID 와 빈 값은 빼고 숫자는 실수로 맞춰서 계산
+    # (시트에서 읽은 "40" 과 폼의 40.0 이 같은 해시, 컬럼이 추가되어도 예전 견적의 해시는 그대로)
+    content = {}
+    for header, value in row.items():
+        if header in (SAVED_AT_FIELD, ESTIMATE_ID_FIELD, CONTENT_HASH_FIELD) or value is None or value == "":
+            continue
+        if isinstance(value, float) and math.isnan(value):
+            continue
+        if header not in text_fields:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                value = str(value)
+        content[header] = value
+    text = json.dumps(content, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def new_estimate_rows(records, saved_at):
+    # 저장할 견적 행 (컬럼명 -> 값), 새 고정 ID 와 내용 해시를 붙임
+    return [
+        {**data, SAVED_AT_FIELD: saved_at, ESTIMATE_ID_FIELD: uuid.uuid4().hex[:12],
+         CONTENT_HASH_FIELD: estimate_content_hash(data)}
+        for data in records
+    ]
+
+
+class EstimateChangedError(ValueError):
+    pass
+
+
+def estimate_versions(table):
+    # 견적 목록 표의 행 키 -> 버전 (읽은 값으로 다시 계산한 내용 해시)
+    # 저장된 해시 컬럼은 시트/DB 에서 값을 직접 고치면 바뀌지 않으므로 쓰지 않음
+    return {index: estimate_content_hash(row) for index, row in table.to_dict("index").items()}
+
+
+def check_estimate_version(data, version):
+    # 목록에서 본 버전과 지금 읽은 행의 내용 해시가 다르면 예외 (다른 사용자가 그 사이 행을 고친 경우)
+    if version and estimate_content_hash(data) != version:
+        raise EstimateChangedError("목록을 불러온 뒤에 견적 내용이 바뀌었습니다. 목록을 새로고침한 뒤 다시 선택하세요.")
+
+
+def restore_estimate(data, version=None):
+    # 불러온 견적 로그 한 행(컬럼명 -> 값)을 입력 폼에 채울 값으로 변환 (앱의 견적 불러오기와 벤치마크가 같이 사용)
+    # version: 목록에서 본 버전 (estimate_versions), 내용이 바뀌었으면 EstimateChangedError
+    check_estimate_version(data, version)
+    data = dict(data)
+
+    # 숫자 데이터 변환 (빈 칸은 빈 문자열로 유지, 숫자가 아닌 값은 0)
+    for field in ESTIMATE_HEADERS:
+        if field in ESTIMATE_TEXT_FIELDS or field not in data:
+            continue
+        if data[field] == "" or pd.isna(data[field]):
+            data[field] = ""
+            continue
+        try:
+            data[field] = float(data[field])
+        except (TypeError, ValueError):
+            data[field] = 0.0
+
+    # 원부자재/임가공비 단가는 단가 내역에서 (컬럼이 없는 새 항목 포함)
+    data.update(parse_item_prices(data))
+    return data
+
+
+def _parse_saved_at(value):
+    try:
+        return datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _unique_rows(rows, existing):
+    # rows: (컬럼명 -> 값 딕셔너리, 쓸 값) 목록, existing: 이미 저장된 (견적ID, 내용해시, 저장일시) 목록
+    # 이미 있는 견적ID 의 행(대기열 재전송)과, 같은 내용이 DUPLICATE_SAVE_WINDOW 안에 저장된 행(중복 제출)은 뺌
+    # 반환: 남은 행의 쓸 값 목록
+    ids = set()
+    saves = {}
+
+    def remember(estimate_id, content_hash, saved_at):
+        if estimate_id:
+            ids.add(estimate_id)
+        saved_at = _parse_saved_at(saved_at)
+        if content_hash and saved_at is not None:
+            saves.setdefault(content_hash, []).append(saved_at)
+
+    for estimate_id, content_hash, saved_at in existing:
+        remember(estimate_id, content_hash, saved_at)
+
+    unique = []
+    for data, value in rows:
+        estimate_id = data.get(ESTIMATE_ID_FIELD) or ""
+        content_hash = data.get(CONTENT_HASH_FIELD) or ""
+        saved_at = _parse_saved_at(data.get(SAVED_AT_FIELD))
+        if estimate_id and estimate_id in ids:
+            continue
+        if saved_at is not None and any(
+            abs(saved_at - previous) <= DUPLICATE_SAVE_WINDOW for previous in saves.get(content_hash, ())
+        ):
+            continue
+        remember(estimate_id, content_hash, data.get(SAVED_AT_FIELD))
+        unique.append(value)
+    return unique
+
+
+def estimate_keys(table):
+    # 견적 로그 표의 행 키: 고정 ID, ID 가 없는 예전 행은 내용 해시 (같은 키가 또 나오면 뒤에 순번)
+    keys = pd.Series("", index=table.index, dtype=object)
+    if ESTIMATE_ID_FIELD in table:
+        keys = table[ESTIMATE_ID_FIELD].fillna("").astype(str)
+    missing = keys == ""
+    if missing.any():
+        keys[missing] = [
+            row.get(CONTENT_HASH_FIELD) or estimate_content_hash(row) for row in table.loc[missing].to_dict("records")
+        ]
+    counts = keys.groupby(keys).cumcount()
+    return keys.where(counts == 0, keys + "-" + (counts + 1).astype(str)).to_numpy()
+
+
+def _row_values(row, headers):
+    # 행(headers 순서의 리스트 또는 컬럼명 -> 값 딕셔너리)을 headers 순서의 리스트로
+    if isinstance(row, dict):
+        return [row.get(header, "") for header in headers]
+    return list(row)
+
+
+def _column_letter(index):
+    # 0부터 세는 열 번호 -> A1 형식 열 이름 (0 -> A, 26 -> AA)
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _escape_like(text):
+    # LIKE 패턴의 %, _ 를 글자 그대로 찾도록 (pandas 검색의 regex=False 와 같은 결과)
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _date_bounds(date_from, date_to):
+    # 날짜 범위를 [시작, 끝) 문자열 경계로 변환 (끝 날짜 하루 전체 포함)
+    start = date_from.isoformat() if date_from else None
+    end = (date_to + datetime.timedelta(days=1)).isoformat() if date_to else None
+    return start, end
+
+
+def query_estimate_table(table, name=None, spec=None, date_from=None, date_to=None,
+                         columns=None, offset=0, limit=50):
+    # 메모리에 있는 견적 목록을 검색하고 한 페이지만 잘라서 반환
+    # 반환: (페이지 DataFrame, 검색 결과 전체 건수)
+    mask = pd.Series(True, index=table.index)
+    if name:
+        mask &= table["견적명"].astype(str).str.contains(name, case=False, regex=False)
+    if spec:
+        mask &= table["규격"].astype(str).str.contains(spec, case=False, regex=False)
+    start, end = _date_bounds(date_from, date_to)
+    if start or end:
+        saved_at = table[SAVED_AT_FIELD].astype(str)
+        if start:
+            mask &= saved_at >= start
+        if end:
+            mask &= (saved_at < end) & (saved_at != "")
+
+    matched = table.index[mask.to_numpy()]
+    page = table.loc[matched[offset:offset + limit], columns if columns else table.columns]
+    return page, len(matched)
+
+
+class SheetsEstimateStore:
+    def __init__(self, run_sheet_operation, headers, text_fields):
+        # run_sheet_operation: 워크시트를 받는 함수를 실행해 주는 함수 (연결 캐시/재연결 담당)
+        self.run_sheet_operation = run_sheet_operation
+        self.headers = headers
+        self.text_fields = text_fields
+        self._sheet_headers = None
+
+    def ensure_headers(self):
+        # 헤더가 없으면 추가하고, 시트에 없는 컬럼은 헤더 끝에 추가 (인스턴스당 한 번만 확인)
+        # 시트의 컬럼 순서는 바꾸지 않으므로 항목을 추가해도 기존 행은 그대로
+        if self._sheet_headers is not None:
+            return self._sheet_headers
+
+        def check(sheet):
+            existing = sheet.row_values(1)
+            if not existing:
+                # 행을 끼워 넣지 않고 1행에 씀 (여러 사용자가 동시에 확인해도 헤더 행이 하나)
+                sheet.update([self.headers], "A1")
+                return list(self.headers)
+            missing = [header for header in self.headers if header not in existing]
+            if missing:
+                sheet.update([existing + missing], "A1")
+            return existing + missing
+
+        self._sheet_headers = self.run_sheet_operation(check)
+        return self._sheet_headers
+
+    def append_rows(self, rows):
+        # 행을 시트의 컬럼 순서에 맞춰서 씀, 이미 있는 견적ID 와 방금 저장한 같은 내용의 행은 건너뜀
+        # (쓰기 직전에 ID/해시/저장일시 열을 한 번의 요청으로 읽으므로 대기열이 같은 묶음을 다시 보내도 한 번만 기록)
+        # 반환: 실제로 쓴 행 (받은 형식 그대로)
+        sheet_headers = self.ensure_headers()
+        rows = list(rows)
+        values = [_row_values(row, self.headers) for row in rows]
+        fields = [dict(zip(self.headers, row)) for row in values]
+        if sheet_headers != self.headers:
+            positions = {header: i for i, header in enumerate(self.headers)}
+            values = [[row[positions[header]] if header in positions else "" for header in sheet_headers] for row in values]
+        check_fields = (ESTIMATE_ID_FIELD, CONTENT_HASH_FIELD, SAVED_AT_FIELD)
+        check = all(field in sheet_headers for field in check_fields) and any(
+            data.get(ESTIMATE_ID_FIELD) or data.get(CONTENT_HASH_FIELD) for data in fields
+        )
+
+        ranges = ["{0}2:{0}".format(_column_letter(sheet_headers.index(field))) for field in check_fields] if check else []
+
+        def append(sheet):
+            existing = ()
+            if check:
+                # 빈 칸으로 끝나는 행/열은 잘려서 오므로 길이를 맞춤
+                columns = [[row[0] if row else "" for row in column] for column in sheet.batch_get(ranges)]
+                length = max(len(column) for column in columns)
+                existing = zip(*(column + [""] * (length - len(column)) for column in columns))
+            unique = _unique_rows(list(zip(fields, zip(rows, values))), existing)
+            if unique:
+                sheet.append_rows([row_values for _, row_values in unique])
+            return [row for row, _ in unique]
+
+        return self.run_sheet_operation(append)
+
+    def load_table(self):
+        # 시트 전체를 한 번의 요청으로 읽어서 DataFrame으로 변환
+        # 숫자 컬럼은 컬럼 단위로 한 번에 변환 (빈 칸은 NaN)
+        values = self.run_sheet_operation(lambda sheet: sheet.get_all_values())
+        if len(values) < 2:
+            return pd.DataFrame(columns=self.headers)
+        return self._to_table(values)
+
+    def get_row(self, estimate_id):
+        # 견적ID 로 그 행만 시트에서 새로 읽음 (캐시된 목록이 아니라 지금 시트에 있는 값, 불러오기 버전 확인용)
+        # ID 열로 행 위치를 찾고 그 행 하나만 읽음, 시트에 없으면 None
+        sheet_headers = self.ensure_headers()
+        if not estimate_id or ESTIMATE_ID_FIELD not in sheet_headers:
+            return None
+
+        def read(sheet):
+            ids = sheet.col_values(sheet_headers.index(ESTIMATE_ID_FIELD) + 1)
+            if estimate_id not in ids[1:]:
+                return None
+            return sheet.row_values(ids.index(estimate_id, 1) + 1)
+
+        row = self.run_sheet_operation(read)
+        if row is None:
+            return None
+        # 끝의 빈 칸은 잘려서 오므로 헤더 길이에 맞춤
+        row = (row + [""] * len(sheet_headers))[:len(sheet_headers)]
+        return self._to_table([sheet_headers, row]).iloc[0].to_dict()
+
+    def _to_table(self, values):
+        # 시트 값(첫 행이 헤더)을 load_table 과 같은 형식의 DataFrame으로
+        df = pd.DataFrame(values[1:], columns=values[0])
+        df = df.loc[:, ~df.columns.duplicated()]
+        # 예전 헤더 확인 경쟁으로 데이터 사이에 끼어든 헤더 행은 뺌
+        df = df[~(df == df.columns).all(axis=1)]
+        df = df.reindex(columns=self.headers, fill_value="")
+        for header in self.headers:
+            if header not in self.text_fields:
+                df[header] = pd.to_numeric(df[header], errors="coerce")
+        # 해시가 없는 예전 행은 읽을 때 계산 (불러오기 버전 확인용)
+        missing = df[CONTENT_HASH_FIELD] == "" if CONTENT_HASH_FIELD in df else pd.Series(False, index=df.index)
+        if missing.any():
+            df.loc[missing, CONTENT_HASH_FIELD] = [
+                estimate_content_hash(row) for row in df.loc[missing].to_dict("records")
+            ]
+        # 행 번호 대신 고정 ID 로 찾음 (목록을 본 뒤에 행이 추가/삭제되어도 같은 견적)
+        df.index = pd.Index(estimate_keys(df), name=ESTIMATE_ID_FIELD)
+        return df
+
+    def iter_rows(self):
+        # 저장된 견적을 한 행씩 컬럼명 -> 값 딕셔너리로 반환 (시트는 한 번에 읽어야 해서 load_table 을 거침)
+        table = self.load_table()
+        for values in table.itertuples(index=False, name=None):
+            yield dict(zip(table.columns, values))
+
+
+class SQLiteEstimateStore:
+    def __init__(self, path, headers, text_fields):
+        self.headers = headers
+        self.text_fields = text_fields
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS estimates ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, saved_at TEXT NOT NULL)"
+            )
+            # 헤더에 새로 추가된 컬럼이 있으면 테이블에도 추가
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(estimates)")}
+            for header in headers:
+                if header not in existing:
+                    self._conn.execute('ALTER TABLE estimates ADD COLUMN "{}" {}'.format(
+                        header, "TEXT" if header in text_fields else "NUMERIC"))
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_estimates_name ON estimates ("견적명")')
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_estimates_saved_at ON estimates (saved_at)")
+            if SAVED_AT_FIELD in headers:
+                self._conn.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_estimates_saved_at_field ON estimates ("{}")'.format(SAVED_AT_FIELD))
+            if ESTIMATE_ID_FIELD in headers:
+                # 같은 ID 를 다시 쓰면 무시 (ID 가 없는 예전 행은 여러 개 가능)
+                self._conn.execute(
+                    'CREATE UNIQUE INDEX IF NOT EXISTS idx_estimates_estimate_id ON estimates ("{0}") '
+                    'WHERE "{0}" IS NOT NULL AND "{0}" != \'\''.format(ESTIMATE_ID_FIELD))
+            if CONTENT_HASH_FIELD in headers:
+                self._conn.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_estimates_content_hash ON estimates ("{}")'.format(CONTENT_HASH_FIELD))
+
+    def append_rows(self, rows):
+        # 이미 있는 견적ID 와 방금 저장한 같은 내용의 행은 건너뜀 (확인과 쓰기를 한 트랜잭션에서)
+        # 반환: 실제로 쓴 행 (컬럼명 -> 값)
+        saved_at = datetime.datetime.now().isoformat(timespec="seconds")
+        placeholders = ", ".join("?" for _ in range(len(self.headers) + 1))
+        quoted = ", ".join('"{}"'.format(header) for header in self.headers)
+        rows = [row if isinstance(row, dict) else dict(zip(self.headers, row)) for row in rows]
+        check_fields = (ESTIMATE_ID_FIELD, CONTENT_HASH_FIELD, SAVED_AT_FIELD)
+        with self._lock, self._conn:
+            existing = []
+            if all(field in self.headers for field in check_fields):
+                # 같은 ID 이거나 같은 해시인 행만 읽음 (저장일시 비교는 _unique_rows 에서)
+                select = 'SELECT "{}", "{}", "{}" FROM estimates WHERE '.format(*check_fields)
+                for field in (ESTIMATE_ID_FIELD, CONTENT_HASH_FIELD):
+                    wanted = sorted({row.get(field) for row in rows if row.get(field)})
+                    for start in range(0, len(wanted), 500):
+                        chunk = wanted[start:start + 500]
+                        existing += self._conn.execute(
+                            select + '"{}" IN ({})'.format(field, ", ".join("?" for _ in chunk)), chunk
+                        ).fetchall()
+            rows = _unique_rows([(row, row) for row in rows], existing)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO estimates (saved_at, " + quoted + ") VALUES (" + placeholders + ")",
+                [[saved_at, *_row_values(row, self.headers)] for row in rows],
+            )
+        return rows
+
+    def _select(self, sql, params=(), columns=None):
+        columns = columns or self.headers
+        quoted = ", ".join('"{}"'.format(column) for column in columns)
+        with self._lock:
+            df = pd.read_sql_query("SELECT id, " + quoted + " FROM estimates" + sql, self._conn,
+                                   params=params, index_col="id")
+        text_columns = [column for column in columns if column in self.text_fields]
+        df[text_columns] = df[text_columns].fillna("")
+        return df
+
+    def load_table(self):
+        return self._select(" ORDER BY id")
+
+    def iter_rows(self, batch_size=1000):
+        # 저장된 견적을 id 순으로 batch_size 행씩 읽어서 한 행씩 컬럼명 -> 값 딕셔너리로 반환
+        # (전체를 DataFrame 으로 올리지 않음, 묶음 사이에는 잠금을 풀어서 저장을 막지 않음)
+        quoted = ", ".join('"{}"'.format(header) for header in self.headers)
+        last_id = 0
+        while True:
+            with self._lock:
+                batch = self._conn.execute(
+                    "SELECT id, " + quoted + " FROM estimates WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size),
+                ).fetchall()
+            if not batch:
+                return
+            for row_id, *values in batch:
+                yield {
+                    header: "" if value is None and header in self.text_fields else value
+                    for header, value in zip(self.headers, values)
+                }
+            last_id = batch[-1][0]
+
+    def get_row(self, row_id):
+        df = self._select(" WHERE id = ?", (int(row_id),))
+        if df.empty:
+            return None
+        return df.iloc[0].to_dict()
+
+    def query(self, name=None, spec=None, date_from=None, date_to=None,
+              columns=None, offset=0, limit=50):
+        # query_estimate_table 과 같은 검색을 SQL로 실행 (필요한 페이지와 컬럼만 읽음)
+        conditions, params = [], []
+        if name:
+            conditions.append('"견적명" LIKE ? ESCAPE \'\\\'')
+            params.append("%{}%".format(_escape_like(name)))
+        if spec:
+            conditions.append('"규격" LIKE ? ESCAPE \'\\\'')
+            params.append("%{}%".format(_escape_like(spec)))
+        start, end = _date_bounds(date_from, date_to)
+        if start:
+            conditions.append('"{}" >= ?'.format(SAVED_AT_FIELD))
+            params.append(start)
+        if end:
+            conditions.append('"{}" < ? AND "{}" != \'\''.format(SAVED_AT_FIELD, SAVED_AT_FIELD))
+            params.append(end)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COUNT(*) FROM estimates" + where, params).fetchone()
+        page = self._select(where + " ORDER BY id LIMIT ? OFFSET ?", [*params, limit, offset], columns)
+        return page, total
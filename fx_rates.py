@@ -0,0 +1,202 @@
+# 환율(₩/$) 제공자와 디스크 캐시
+# 계산 경로는 캐시된 값만 읽고 제공자를 기다리지 않음, TTL 이 지나면 백그라운드 스레드에서 갱신
+# 갱신에 실패하면 마지막 값을 계속 쓰고, 오래된 값(max_age 초과)은 화면/응답에서 경고
+#
+# 환경변수:
+#   WETWIPE_FX_PROVIDER   fixed (기본값) | file | http
+#   WETWIPE_FX_RATE       fixed 제공자의 환율 (기본값 1500)
+#   WETWIPE_FX_FILE       file 제공자가 읽을 JSON 파일 {"rate": 1385.2} (기본값 fx_rate.json)
+#   WETWIPE_FX_URL        http 제공자가 읽을 JSON 주소 (기본값 open.er-api.com 의 USD 기준 환율)
+#   WETWIPE_FX_FIELD      응답 JSON 에서 원화 환율 위치 (점으로 구분, 기본값 rates.KRW)
+#   WETWIPE_FX_CACHE_PATH 캐시 파일 (기본값 fx_rate_cache.json)
+#   WETWIPE_FX_TTL        갱신 주기 (초, 기본값 3600)
+#   WETWIPE_FX_MAX_AGE    이 시간(초)보다 오래된 환율은 경고 (기본값 86400)
+import datetime
+import json
+import logging
+import math
+import os
+import threading
+import time
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+# 캐시도 제공자 값도 없을 때 쓰는 환율 (예전 입력 폼 기본값)
+FALLBACK_RATE = 1500.0
+
+DEFAULT_FX_URL = "https://open.er-api.com/v6/latest/USD"
+
+
+def _check_rate(value):
+    rate = float(value)
+    if not (math.isfinite(rate) and rate > 0):
+        raise ValueError(f"환율이 올바르지 않습니다: {value!r}")
+    return rate
+
+
+class FixedRateProvider:
+    # 고정 환율 (오프라인/테스트용)
+    # local: 네트워크 없이 바로 읽을 수 있는 제공자 (캐시가 없으면 시작할 때 바로 읽음)
+    local = True
+
+    def __init__(self, rate=FALLBACK_RATE):
+        self.rate = _check_rate(rate)
+        self.source = f"fixed:{self.rate:g}"
+
+    def fetch(self):
+        return self.rate
+
+
+class FileRateProvider:
+    # 로컬 JSON 파일 {"rate": 1385.2} (다른 작업이 파일을 갱신하는 오프라인 환경용)
+    local = True
+
+    def __init__(self, path):
+        self.path = path
+        self.source = f"file:{path}"
+
+    def fetch(self):
+        with open(self.path, encoding="utf-8") as f:
+            return _check_rate(json.load(f)["rate"])
+
+
+class HttpRateProvider:
+    # JSON 응답에서 field(점으로 구분한 경로) 위치의 원화 환율을 읽음
+    local = False
+
+    def __init__(self, url=DEFAULT_FX_URL, field="rates.KRW", timeout=5.0):
+        self.url = url
+        self.field = field
+        self.timeout = timeout
+        self.source = f"http:{url}"
+
+    def fetch(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            data = json.load(response)
+        for key in self.field.split("."):
+            data = data[key]
+        return _check_rate(data)
+
+
+class RateSnapshot:
+    def __init__(self, rate, fetched_at, source):
+        self.rate = rate
+        # 제공자에서 받은 시각 (epoch 초, 한 번도 받지 못했으면 None)
+        self.fetched_at = fetched_at
+        self.source = source
+
+    def age(self, now=None):
+        if self.fetched_at is None:
+            return math.inf
+        return max(0.0, (now or time.time()) - self.fetched_at)
+
+    def as_dict(self, max_age):
+        fetched_at = None
+        if self.fetched_at is not None:
+            fetched_at = datetime.datetime.fromtimestamp(self.fetched_at).isoformat(timespec="seconds")
+        return {
+            "rate": self.rate,
+            "source": self.source,
+            "fetched_at": fetched_at,
+            "stale": self.age() > max_age,
+        }
+
+
+class CachedRateProvider:
+    def __init__(self, provider, cache_path, ttl=3600, max_age=86400, fallback_rate=FALLBACK_RATE):
+        self.provider = provider
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.fallback_rate = fallback_rate
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._snapshot = self._read_cache()
+        if self._snapshot is None and provider.local:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("환율 읽기 실패 (%s): %s", provider.source, e)
+                self.last_error = str(e)
+
+    def current(self):
+        # 캐시된 환율을 바로 반환, TTL 이 지났으면 백그라운드 갱신만 시작 (제공자를 기다리지 않음)
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None or snapshot.age() > self.ttl:
+            self._refresh_in_background()
+        return snapshot or RateSnapshot(self.fallback_rate, None, "fallback")
+
+    def is_stale(self, snapshot):
+        return snapshot.age() > self.max_age
+
+    def refresh(self):
+        # 제공자에서 환율을 받아 메모리와 캐시 파일에 저장 (받지 못하면 예외, 기존 값은 유지)
+        snapshot = RateSnapshot(self.provider.fetch(), time.time(), self.provider.source)
+        with self._lock:
+            self._snapshot = snapshot
+            self.last_error = None
+        try:
+            self._write_cache(snapshot)
+        except OSError as e:
+            logger.warning("환율 캐시 파일 저장 실패 (%s): %s", self.cache_path, e)
+        return snapshot
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("환율 갱신 실패 (%s): %s", self.provider.source, e)
+                with self._lock:
+                    self.last_error = str(e)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="fx-refresh", daemon=True).start()
+
+    def _read_cache(self):
+        # 다른 제공자로 받은 캐시는 쓰지 않음
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("source") != self.provider.source:
+                return None
+            return RateSnapshot(_check_rate(cached["rate"]), float(cached["fetched_at"]), cached["source"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_cache(self, snapshot):
+        # 임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않게)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"rate": snapshot.rate, "fetched_at": snapshot.fetched_at, "source": snapshot.source}, f)
+        os.replace(temp_path, self.cache_path)
+
+
+def rate_provider_from_env(environ=os.environ):
+    kind = environ.get("WETWIPE_FX_PROVIDER", "fixed")
+    if kind == "fixed":
+        return FixedRateProvider(environ.get("WETWIPE_FX_RATE", FALLBACK_RATE))
+    if kind == "file":
+        return FileRateProvider(environ.get("WETWIPE_FX_FILE", "fx_rate.json"))
+    if kind == "http":
+        return HttpRateProvider(environ.get("WETWIPE_FX_URL", DEFAULT_FX_URL), environ.get("WETWIPE_FX_FIELD", "rates.KRW"))
+    raise ValueError(f"알 수 없는 환율 제공자입니다: {kind}")
+
+
+def cached_rate_provider_from_env(environ=os.environ):
+    return CachedRateProvider(
+        rate_provider_from_env(environ),
+        environ.get("WETWIPE_FX_CACHE_PATH", "fx_rate_cache.json"),
+        ttl=float(environ.get("WETWIPE_FX_TTL", 3600)),
+        max_age=float(environ.get("WETWIPE_FX_MAX_AGE", 86400)),
+    )
@@ -0,0 +1,244 @@
+# PDF 견적서 엔진
+# - 한글 폰트는 프로세스당 한 번 등록
+# - 견적마다 항목/금액 표를 그리고, 표가 한 페이지를 넘으면 다음 페이지에 머리글을 반복
+# - reportlab 은 문서 전체를 메모리에 들고 있다가 save 때 한 번에 쓰므로, 견적이 많으면
+#   chunk_size 건씩 따로 그린 뒤 각 조각의 객체 번호를 바꿔서 출력 파일에 바로 이어 씀
+#   (메모리 사용량은 조각 하나 크기로 제한되고, 결과는 하나의 PDF)
+#   조각마다 폰트 서브셋이 따로 들어가서 파일은 한 번에 그린 것보다 조금 큼
+#   reportlab 이 만드는 형식(압축하지 않은 xref 표, 한 단계 페이지 트리)만 처리하고, 다르면 ValueError
+import functools
+import itertools
+import re
+from io import BytesIO
+
+PDF_FONT = "NanumGothic"
+
+PAGE_MARGIN = 50
+TITLE_FONT_SIZE = 16
+TABLE_FONT_SIZE = 10
+
+# 조각 하나에 그릴 견적 수
+DEFAULT_CHUNK_SIZE = 100
+
+
+# PDF 한글 폰트 등록 (프로세스당 한 번)
+@functools.lru_cache(maxsize=None)
+def register_pdf_fonts():
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    import matplotlib.font_manager as fm
+
+    nanum_font_path = fm.findfont("NanumGothic")
+    pdfmetrics.registerFont(TTFont("NanumGothic", nanum_font_path))
+    pdfmetrics.registerFont(UnicodeCIDFont("HYGothic-Medium"))
+
+
+# 표 스타일 (머리글, 소계 행, 총원가/제안가 행)
+@functools.lru_cache(maxsize=None)
+def _base_table_style():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ("FONT", (0, 0), (-1, -1), PDF_FONT, TABLE_FONT_SIZE),
+        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#BBBBBB")),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#333333")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("TOPPADDING", (0, 0), (-1, -1), 3),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+    ])
+
+
+def _estimate_table(summary, width):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table
+
+    rows = [["항목", "금액 (원)"]]
+    styles = []
+    for name, value in summary.items():
+        # "-- 원부자재 소계" 같은 소계 행은 음영으로 구분
+        if name.startswith("-- "):
+            name = name[3:]
+            styles.append(("BACKGROUND", (0, len(rows)), (-1, len(rows)), colors.HexColor("#EEEEEE")))
+        elif name in ("총원가", "제안가(판매가)"):
+            styles.append(("BACKGROUND", (0, len(rows)), (-1, len(rows)), colors.HexColor("#DDE7F3")))
+        rows.append([name, f"{value:,.2f}"])
+
+    table = Table(rows, colWidths=[width * 0.6, width * 0.4], repeatRows=1)
+    table.setStyle(_base_table_style())
+    table.setStyle(styles)
+    return table
+
+
+def draw_estimate(c, title, summary):
+    # 견적 하나를 새 페이지부터 그림 (표가 길면 여러 페이지)
+    page_width, page_height = c._pagesize
+    width = page_width - 2 * PAGE_MARGIN
+
+    c.setFillColorRGB(0.2, 0.2, 0.2)
+    c.setFont(PDF_FONT, TITLE_FONT_SIZE)
+    c.drawString(PAGE_MARGIN, page_height - PAGE_MARGIN - TITLE_FONT_SIZE, title)
+    top = page_height - PAGE_MARGIN - TITLE_FONT_SIZE - 20
+
+    table = _estimate_table(summary, width)
+    while True:
+        available = top - PAGE_MARGIN
+        _, height = table.wrapOn(c, width, available)
+        if height <= available:
+            table.drawOn(c, PAGE_MARGIN, top - height)
+            break
+        parts = table.splitOn(c, width, available)
+        if len(parts) < 2:
+            # 첫 행도 들어가지 않는 경우 (여백이 너무 작음), 넘치더라도 그림
+            table.drawOn(c, PAGE_MARGIN, top - height)
+            break
+        first, table = parts[0], parts[1]
+        _, first_height = first.wrapOn(c, width, available)
+        first.drawOn(c, PAGE_MARGIN, top - first_height)
+        c.showPage()
+        top = page_height - PAGE_MARGIN
+    c.showPage()
+
+
+def render_estimates_pdf(estimates):
+    # 견적 목록을 reportlab 으로 한 번에 그린 PDF 바이트
+    # estimates: (제목, cost_summary) 목록
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    register_pdf_fonts()
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    for title, summary in estimates:
+        draw_estimate(c, title, summary)
+    c.save()
+    return buffer.getvalue()
+
+
+_REFERENCE = re.compile(rb"(\d+) 0 R\b")
+
+
+def _parse_pdf(data):
+    # reportlab 이 만든 PDF 의 객체(번호 -> 바이트)와 트레일러
+    xref_offset = int(data[data.rindex(b"startxref") + len(b"startxref"):].split()[0])
+    if not data.startswith(b"xref", xref_offset) or b"/ObjStm" in data:
+        raise ValueError("xref 표가 없거나 객체 스트림을 쓰는 PDF 는 이어 쓸 수 없습니다.")
+    lines = data[xref_offset:].split(b"\n")
+    first, count = (int(value) for value in lines[1].split())
+    offsets = {}
+    for number, line in enumerate(lines[2:2 + count], start=first):
+        offset, _, kind = line.split()[:3]
+        if kind == b"n":
+            offsets[number] = int(offset)
+
+    # 객체는 다음 객체(마지막은 xref) 시작 전까지
+    ordered = sorted(offsets.items(), key=lambda item: item[1])
+    ends = [offset for _, offset in ordered[1:]] + [xref_offset]
+    objects = {}
+    for (number, start), end in zip(ordered, ends):
+        body = data[start:end]
+        body = body[body.index(b" obj") + len(b" obj"):body.rindex(b"endobj")].strip(b"\r\n")
+        objects[number] = body
+    trailer = data[data.index(b"trailer", xref_offset):data.rindex(b"startxref")]
+    return objects, trailer
+
+
+def _reference(body, key):
+    match = re.search(rb"/" + key + rb" (\d+) 0 R", body)
+    return int(match.group(1)) if match else None
+
+
+class PdfStreamWriter:
+    # reportlab 으로 그린 PDF 조각들의 페이지를 하나의 PDF 로 이어서 파일에 바로 씀
+    # 조각의 카탈로그/페이지 트리/문서 정보는 버리고 나머지 객체는 번호만 바꿔서 그대로 복사
+    CATALOG = 1
+    PAGES = 2
+
+    def __init__(self, output):
+        # output: 바이너리 쓰기 파일 객체 (이미 쓰인 내용이 없어야 함)
+        self.output = output
+        self._position = 0
+        self._offsets = {}
+        self._next_number = 3
+        self._pages = []
+        self._write(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+
+    def _write(self, data):
+        self.output.write(data)
+        self._position += len(data)
+
+    def _write_object(self, number, body):
+        self._offsets[number] = self._position
+        self._write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def add_pdf(self, data):
+        objects, trailer = _parse_pdf(data)
+        catalog = _reference(trailer, b"Root")
+        info = _reference(trailer, b"Info")
+        pages = _reference(objects[catalog], b"Pages")
+        outlines = _reference(objects[catalog], b"Outlines")
+        kids = [int(n) for n in _REFERENCE.findall(objects[pages][objects[pages].index(b"/Kids"):])]
+        if not all(re.search(rb"/Type /Page\b", objects[kid]) for kid in kids):
+            raise ValueError("페이지 트리가 한 단계가 아닌 PDF 는 이어 쓸 수 없습니다.")
+        skipped = {catalog, info, pages, outlines}
+
+        numbers = {}
+        for number in sorted(objects):
+            if number not in skipped:
+                numbers[number] = self._next_number
+                self._next_number += 1
+        numbers[pages] = self.PAGES
+
+        def renumber(match):
+            return b"%d 0 R" % numbers[int(match.group(1))]
+
+        for number, new_number in numbers.items():
+            if number == pages:
+                continue
+            body = objects[number]
+            # 스트림 내용은 그대로 두고 사전 부분의 참조 번호만 바꿈
+            split = body.find(b"\nstream")
+            head, stream = (body, b"") if split < 0 else (body[:split], body[split:])
+            self._write_object(new_number, _REFERENCE.sub(renumber, head) + stream)
+        self._pages.extend(numbers[kid] for kid in kids)
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % number for number in self._pages)
+        self._write_object(self.PAGES, b"<< /Count %d /Kids [ %s ] /Type /Pages >>" % (len(self._pages), kids))
+        self._write_object(self.CATALOG, b"<< /Pages %d 0 R /Type /Catalog >>" % self.PAGES)
+
+        size = self._next_number
+        xref_offset = self._position
+        entries = [b"0000000000 65535 f \n"]
+        for number in range(1, size):
+            entries.append(b"%010d 00000 n \n" % self._offsets[number])
+        self._write(b"xref\n0 %d\n" % size + b"".join(entries))
+        self._write(b"trailer\n<< /Root %d 0 R /Size %d >>\nstartxref\n%d\n%%%%EOF\n" % (self.CATALOG, size, xref_offset))
+
+
+def write_estimates_pdf(estimates, output, chunk_size=DEFAULT_CHUNK_SIZE):
+    # 견적 목록을 PDF 로 씀, estimates 는 (제목, cost_summary) 반복자 (필요한 만큼만 읽음)
+    # output: 파일 경로 또는 바이너리 쓰기 파일 객체
+    # 반환: 그린 견적 수
+    if isinstance(output, (str, bytes)) or hasattr(output, "__fspath__"):
+        with open(output, "wb") as f:
+            return write_estimates_pdf(estimates, f, chunk_size)
+
+    estimates = iter(estimates)
+    chunk = list(itertools.islice(estimates, chunk_size))
+    following = list(itertools.islice(estimates, chunk_size))
+    if not following:
+        # 조각 하나로 끝나면 reportlab 결과를 그대로 씀
+        output.write(render_estimates_pdf(chunk))
+        return len(chunk)
+
+    writer = PdfStreamWriter(output)
+    count = 0
+    while chunk:
+        writer.add_pdf(render_estimates_pdf(chunk))
+        count += len(chunk)
+        chunk, following = following, list(itertools.islice(estimates, chunk_size))
+    writer.close()
+    return count
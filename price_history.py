@@ -0,0 +1,207 @@
+# 단가 이력 (항목별 적용일 -> 단가)
+# price_history.csv (항목, 적용일, 단가) 를 읽어서 항목별로 적용일 순 배열을 만들어 두고,
+# "X일 기준 단가"를 이진 탐색으로 찾음 (항목당 O(log n), 여러 날짜는 np.searchsorted 로 한 번에)
+# 저장된 견적을 특정 날짜(또는 견적별 저장일) 단가로 다시 계산하는 재견적도 여기서 처리
+import os
+
+import numpy as np
+import pandas as pd
+
+from cost_catalogue import load_cost_catalogue
+from estimate_store import (
+    LEGACY_OTHER_COST_NAME_FIELDS, LEGACY_OTHER_COST_VALUE_FIELDS, OTHER_COSTS_FIELD, SAVED_AT_FIELD, USD_PRICE_FIELD,
+    item_price_table, parse_other_costs
+)
+from wetwipe_cost import DEFAULT_USD_PRICE_PER_KG, calculate_wetwipe_cost_batch
+
+# 기본 단가 이력 파일, 환경변수 WETWIPE_PRICE_HISTORY 로 변경 가능 (파일이 없으면 이력 없음)
+DEFAULT_PRICE_HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_history.csv")
+
+# 원단 가격 항목명 (usd_price_per_kg, 대량 견적 양식의 컬럼명과 같음)
+FABRIC_PRICE_ITEM = "원단 가격($/kg)"
+
+PRICE_HISTORY_COLUMNS = ["항목", "적용일", "단가"]
+
+
+class PriceHistory:
+    def __init__(self, entries=()):
+        # entries: (항목명, 적용일, 단가) 목록, 적용일은 날짜로 변환 가능한 값
+        by_item = {}
+        for item, effective_date, price in entries:
+            by_item.setdefault(item, []).append((np.datetime64(effective_date, "D"), float(price)))
+
+        # 항목명 -> 적용일 순으로 정렬된 적용일/단가 배열
+        self._dates = {}
+        self._prices = {}
+        for item, rows in by_item.items():
+            rows.sort()
+            dates = np.array([date for date, _ in rows], dtype="datetime64[D]")
+            if (dates[1:] == dates[:-1]).any():
+                raise ValueError(f"'{item}' 항목에 적용일이 같은 단가가 있습니다.")
+            self._dates[item] = dates
+            self._prices[item] = np.array([price for _, price in rows])
+
+    def __len__(self):
+        return sum(len(dates) for dates in self._dates.values())
+
+    def items(self):
+        return list(self._dates)
+
+    def price_as_of(self, item, as_of, default=None):
+        # as_of 날짜에 적용 중인 단가 (그 전에 적용된 단가가 없으면 default)
+        dates = self._dates.get(item)
+        if dates is None:
+            return default
+        position = int(np.searchsorted(dates, np.datetime64(as_of, "D"), side="right")) - 1
+        return default if position < 0 else float(self._prices[item][position])
+
+    def prices_at(self, item, as_of, default):
+        # 날짜 배열의 각 날짜에 적용 중인 단가 배열
+        # default: 적용된 단가가 없거나 날짜가 빈 값일 때 쓸 값 (스칼라 또는 같은 길이의 배열)
+        as_of = np.asarray(as_of, dtype="datetime64[D]")
+        default = np.broadcast_to(np.asarray(default, dtype=float), as_of.shape)
+        dates = self._dates.get(item)
+        if dates is None:
+            return default.copy()
+        positions = np.searchsorted(dates, as_of, side="right") - 1
+        prices = self._prices[item][np.maximum(positions, 0)]
+        return np.where((positions >= 0) & ~np.isnat(as_of), prices, default)
+
+    def quote_prices(self, as_of, catalogue=None):
+        # as_of 기준 단가를 calculate_wetwipe_cost 인자로 반환 (이력이 없는 항목은 cost_items.toml 기본값)
+        catalogue = catalogue or load_cost_catalogue()
+        return {
+            "usd_price_per_kg": self.price_as_of(FABRIC_PRICE_ITEM, as_of, DEFAULT_USD_PRICE_PER_KG),
+            "submaterials": {
+                name: self.price_as_of(name, as_of, default) for name, default in catalogue.submaterials.items()
+            },
+            "processing_costs": {
+                name: self.price_as_of(name, as_of, default) for name, default in catalogue.processing_costs.items()
+            },
+        }
+
+
+def price_history_from_table(table, catalogue=None):
+    # 항목/적용일/단가 컬럼이 있는 표를 단가 이력으로 변환
+    catalogue = catalogue or load_cost_catalogue()
+    missing = [column for column in PRICE_HISTORY_COLUMNS if column not in table.columns]
+    if missing:
+        raise ValueError("단가 이력에 컬럼이 없습니다: {}".format(", ".join(missing)))
+
+    items = table["항목"].astype(str).str.strip()
+    known = {FABRIC_PRICE_ITEM, *catalogue.item_names()}
+    unknown = sorted(set(items) - known)
+    if unknown:
+        raise ValueError("알 수 없는 항목입니다: {}".format(", ".join(unknown)))
+    dates = pd.to_datetime(table["적용일"], errors="coerce")
+    prices = pd.to_numeric(table["단가"], errors="coerce")
+    invalid = table.index[dates.isna() | prices.isna()]
+    if len(invalid):
+        raise ValueError("적용일 또는 단가가 올바르지 않은 행이 있습니다: {}".format(
+            ", ".join(str(i + 2) for i in invalid[:10])))
+    return PriceHistory(zip(items, dates.to_numpy().astype("datetime64[D]"), prices))
+
+
+def load_price_history(path=None):
+    path = path or os.environ.get("WETWIPE_PRICE_HISTORY") or DEFAULT_PRICE_HISTORY_PATH
+    if not os.path.exists(path):
+        return PriceHistory()
+    return price_history_from_table(pd.read_csv(path, encoding="utf-8-sig"))
+
+
+def price_history_template(history, as_of, catalogue=None):
+    # as_of 기준 단가로 채운 단가 이력 양식
+    prices = history.quote_prices(as_of, catalogue)
+    items = {FABRIC_PRICE_ITEM: prices["usd_price_per_kg"], **prices["submaterials"], **prices["processing_costs"]}
+    return pd.DataFrame({
+        "항목": list(items),
+        "적용일": str(np.datetime64(as_of, "D")),
+        "단가": list(items.values()),
+    }, columns=PRICE_HISTORY_COLUMNS)
+
+
+def requote_estimates(table, history, as_of=None, catalogue=None):
+    # 저장된 견적(견적 로그 표)을 as_of 기준 단가로 다시 계산, as_of 가 None 이면 견적마다 저장일 기준
+    # 단가 이력에 있는 항목만 바꾸고 환율, 관세, 기타 비용, 이력이 없는 항목은 저장된 값 그대로 사용
+    catalogue = catalogue or load_cost_catalogue()
+
+    def numeric(name):
+        if name not in table:
+            return pd.Series(np.nan, index=table.index)
+        return pd.to_numeric(table[name], errors="coerce")
+
+    spec = table["규격"].astype(str).str.split("x", n=1, expand=True).reindex(columns=[0, 1])
+    exchange_rate = numeric("환율")
+    percent_applied = numeric("관세비율")
+    if as_of is None:
+        dates = pd.to_datetime(table[SAVED_AT_FIELD], errors="coerce").to_numpy().astype("datetime64[D]")
+    else:
+        dates = np.full(len(table), np.datetime64(as_of, "D"))
+    # 저장된 원단 가격, 없는 예전 행은 저장된 기초가격에서 역산 (기초가격은 반올림된 값이라 조금 다를 수 있음)
+    saved_usd_price = numeric(USD_PRICE_FIELD).fillna(numeric("기초가격") / (exchange_rate * (1 + percent_applied / 100)))
+
+    inputs = pd.DataFrame({
+        "width_mm": pd.to_numeric(spec[0], errors="coerce"),
+        "height_mm": pd.to_numeric(spec[1], errors="coerce"),
+        "gsm": numeric("평량"),
+        "exchange_rate": exchange_rate,
+        "percent_applied": percent_applied,
+        "quantity_per_unit": numeric("매수"),
+        "margin_rate": numeric("마진율"),
+        "corporate_profit": numeric("기업이윤"),
+        "usd_price_per_kg": history.prices_at(FABRIC_PRICE_ITEM, dates, saved_usd_price.to_numpy()),
+    }, index=table.index)
+
+    saved_prices = item_price_table(table, catalogue.item_names())
+
+    def repriced(items):
+        return {
+            name: history.prices_at(name, dates, saved_prices[name].fillna(default).to_numpy())
+            for name, default in items.items()
+        }
+
+    other_cost_columns = [
+        column for column in (OTHER_COSTS_FIELD, *LEGACY_OTHER_COST_NAME_FIELDS, *LEGACY_OTHER_COST_VALUE_FIELDS)
+        if column in table
+    ]
+    other_totals = np.array([
+        sum(parse_other_costs(row).values()) for row in table[other_cost_columns].to_dict("records")
+    ], dtype=float)
+
+    results = calculate_wetwipe_cost_batch(
+        inputs,
+        submaterials=repriced(catalogue.submaterials),
+        processing_costs=repriced(catalogue.processing_costs),
+        other_costs={"기타 비용": other_totals}
+    )
+    saved_price = numeric("제안가")
+    return pd.DataFrame({
+        "견적명": table["견적명"],
+        "규격": table["규격"],
+        SAVED_AT_FIELD: table[SAVED_AT_FIELD],
+        "기준일": pd.to_datetime(dates).date,
+        "저장 총원가": numeric("총원가"),
+        "저장 제안가": saved_price,
+        "재계산 총원가": results["총원가"],
+        "재계산 제안가": results["제안가(판매가)"],
+        "제안가 차이": (results["제안가(판매가)"] - saved_price).round(2),
+        # 저장된 제안가가 0 이면 차이율은 빈 값
+        "차이율(%)": ((results["제안가(판매가)"] / saved_price.where(saved_price != 0) - 1) * 100).round(2),
+    }, index=table.index)
+
+
+def compare_price_dates(table, history, date_a, date_b, catalogue=None):
+    # 같은 견적을 두 기준일 단가로 계산해서 비교 (date_a 가 None 이면 견적별 저장일 기준)
+    before = requote_estimates(table, history, date_a, catalogue)
+    after = requote_estimates(table, history, date_b, catalogue)
+    label_a = "저장일" if date_a is None else str(np.datetime64(date_a, "D"))
+    label_b = "저장일" if date_b is None else str(np.datetime64(date_b, "D"))
+    return pd.DataFrame({
+        "견적명": table["견적명"],
+        "규격": table["규격"],
+        SAVED_AT_FIELD: table[SAVED_AT_FIELD],
+        f"제안가 A ({label_a})": before["재계산 제안가"],
+        f"제안가 B ({label_b})": after["재계산 제안가"],
+        "차이": (after["재계산 제안가"] - before["재계산 제안가"]).round(2),
+        "차이율(%)": ((after["재계산 제안가"] / before["재계산 제안가"].where(before["재계산 제안가"] != 0) - 1) * 100).round(2),
+    }, index=table.index)
@@ -0,0 +1,93 @@
+# 계산 결과 캐시
+# 정규화한 입력값의 해시를 키로 계산 결과, 차트 이미지, 내보내기 파일을 함께 보관 (LRU, 메모리 상한)
+# 모든 세션이 같은 캐시를 쓰므로 바이트가 아닌 값은 넣을 때와 꺼낼 때 복사 (한 세션이 고쳐도 다른 세션 결과는 그대로)
+import copy
+import hashlib
+import json
+import numbers
+import pickle
+import threading
+from collections import OrderedDict
+
+
+def _normalize(value):
+    # 150 과 150.0 처럼 같은 값은 같은 키가 되도록 숫자는 float 로 통일 (dict 는 항목 순서 유지)
+    if isinstance(value, dict):
+        return [[str(k), _normalize(v)] for k, v in value.items()]
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, numbers.Number):
+        return float(value)
+    return str(value)
+
+
+def make_cache_key(*inputs):
+    payload = json.dumps(_normalize(inputs), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _private_copy(value):
+    # bytes 는 바꿀 수 없어서 그대로, 나머지(결과 딕셔너리, 차트 명세 등)는 깊은 복사
+    if isinstance(value, (bytes, str)):
+        return value
+    return copy.deepcopy(value)
+
+
+def _size_of(value):
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict) and all(isinstance(v, (bytes, bytearray)) for v in value.values()):
+        return sum(len(v) for v in value.values())
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class ResultCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=256):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # 키 -> {항목명: (값, 크기)}
+        self._lock = threading.Lock()
+
+    def get(self, key, field):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or field not in entry:
+                return None
+            self._entries.move_to_end(key)
+            value = entry[field][0]
+        return _private_copy(value)
+
+    def put(self, key, field, value):
+        # value 는 호출한 쪽이 계속 쓰므로 복사본을 보관
+        size = _size_of(value)
+        stored = _private_copy(value)
+        with self._lock:
+            entry = self._entries.setdefault(key, {})
+            if field in entry:
+                self.total_bytes -= entry[field][1]
+            entry[field] = (stored, size)
+            self.total_bytes += size
+            self._entries.move_to_end(key)
+            self._evict()
+        return value
+
+    def get_or_create(self, key, field, factory):
+        # 캐시에 없으면 factory() 로 만들어서 저장
+        value = self.get(key, field)
+        if value is None:
+            value = self.put(key, field, factory())
+        return value
+
+    def _evict(self):
+        # 가장 오래 안 쓴 키부터 삭제 (방금 넣은 키 하나는 상한을 넘어도 유지)
+        while len(self._entries) > 1 and (
+            self.total_bytes > self.max_bytes or len(self._entries) > self.max_entries
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self.total_bytes -= sum(size for _, size in entry.values())
+
+    def __len__(self):
+        return len(self._entries)
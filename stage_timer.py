@@ -0,0 +1,125 @@
+# 단계별 처리 시간 측정
+# 시트 인증, 저장, 계산, PDF/Excel 생성, 차트 렌더링 등 각 단계의 최근 실행 시간을 모아서
+# 디버그 패널 표, DEBUG 로그(JSON 한 줄), Prometheus 텍스트 형식으로 제공
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+def _quantile(ordered, q):
+    # 정렬된 목록의 분위수 (선형 보간)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class StageTimer:
+    def __init__(self, window=500):
+        # window: 분위수 계산에 쓸 단계별 최근 실행 수
+        self.window = window
+        self._lock = threading.Lock()
+        self._recent = defaultdict(lambda: deque(maxlen=window))
+        self._count = defaultdict(int)
+        self._total = defaultdict(float)
+        self._errors = defaultdict(int)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, failed)
+
+    def timed(self, stage_name, fn, /, *args, **kwargs):
+        # 앞의 두 인자는 위치 전용 (fn 이 name= 같은 키워드 인자를 받을 수 있게)
+        with self.stage(stage_name):
+            return fn(*args, **kwargs)
+
+    def record(self, name, seconds, failed=False):
+        with self._lock:
+            self._recent[name].append(seconds)
+            self._count[name] += 1
+            self._total[name] += seconds
+            if failed:
+                self._errors[name] += 1
+        # 요청마다 찍히지 않게 DEBUG 수준 (logging.getLogger("stage_timer").setLevel(logging.DEBUG) 로 켬)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({"stage": name, "ms": round(seconds * 1000, 3), "error": failed}, ensure_ascii=False))
+
+    def summary(self):
+        # 단계별 통계 목록 (마지막, p50, p95 는 최근 window 회 기준, 밀리초)
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._recent.items()}
+            counts, totals, errors = dict(self._count), dict(self._total), dict(self._errors)
+        rows = []
+        for name, samples in snapshot.items():
+            ordered = sorted(samples)
+            rows.append({
+                "단계": name,
+                "횟수": counts[name],
+                "오류": errors.get(name, 0),
+                "마지막(ms)": round(samples[-1] * 1000, 2),
+                "p50(ms)": round(_quantile(ordered, 0.5) * 1000, 2),
+                "p95(ms)": round(_quantile(ordered, 0.95) * 1000, 2),
+                "합계(s)": round(totals[name], 3),
+            })
+        return rows
+
+    def prometheus_text(self, prefix="wetwipe_stage"):
+        # Prometheus summary 형식 (초 단위)
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._recent.items()}
+            counts, totals, errors = dict(self._count), dict(self._total), dict(self._errors)
+        lines = [
+            f"# HELP {prefix}_seconds 단계별 처리 시간",
+            f"# TYPE {prefix}_seconds summary",
+        ]
+        for name, ordered in sorted(snapshot.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for q in (0.5, 0.95):
+                lines.append(f'{prefix}_seconds{{stage="{label}",quantile="{q}"}} {_quantile(ordered, q):.6f}')
+            lines.append(f'{prefix}_seconds_sum{{stage="{label}"}} {totals[name]:.6f}')
+            lines.append(f'{prefix}_seconds_count{{stage="{label}"}} {counts[name]}')
+        lines.append(f"# HELP {prefix}_errors_total 단계별 오류 수")
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for name in sorted(snapshot):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{prefix}_errors_total{{stage="{label}"}} {errors.get(name, 0)}')
+        return "\n".join(lines) + "\n"
+
+
+def serve_metrics(timer, host="127.0.0.1", port=9464):
+    # GET /metrics 로 Prometheus 텍스트를 돌려주는 서버를 백그라운드 스레드에서 실행
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            data = timer.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stage-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,472 @@
+# 물티슈 원가 계산 핵심 로직
+# Streamlit 없이 불러올 수 있어서 앱, 대량 견적, HTTP/CLI 서비스(cost_service.py)가 함께 사용
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from cost_catalogue import load_cost_catalogue
+
+# 원가 항목 목록 (cost_items.toml)
+CATALOGUE = load_cost_catalogue()
+
+# 원부자재/임가공비/기타 비용 기본 단가 (원)
+DEFAULT_SUBMATERIALS = CATALOGUE.submaterials
+DEFAULT_PROCESSING_COSTS = CATALOGUE.processing_costs
+DEFAULT_OTHER_COSTS = CATALOGUE.other_costs
+
+# 원단 기본 가격 ($/kg)
+DEFAULT_USD_PRICE_PER_KG = 1.46
+
+def default_processing_costs(**cost_params):
+    # 임가공비 기본값, 인자로 받은 항목(labor_cost 등)은 그 값으로 바꿈
+    processing_costs = {}
+    for name, default in DEFAULT_PROCESSING_COSTS.items():
+        value = cost_params.get(CATALOGUE.params.get(name))
+        processing_costs[name] = default if value is None else value
+    return processing_costs
+
+def _fabric_costs(width_mm, height_mm, gsm, exchange_rate, percent_applied, quantity_per_unit, usd_price_per_kg):
+    # 원단 비용 (1장당 원단 가격, 원단 총액, 기초가격)
+    area_m2 = (width_mm / 1000) * (height_mm / 1000)
+    applied_usd_price = usd_price_per_kg * (1 + percent_applied / 100)  # 백분율을 소수로 변환
+    unit_price_per_g = applied_usd_price * exchange_rate / 1000
+    gsm_price = unit_price_per_g * gsm
+    loss_rate_fabric = 0.05
+    applied_unit_price = gsm_price * (1 + loss_rate_fabric)
+    fabric_cost_per_sheet = area_m2 * applied_unit_price
+    fabric_cost_total = fabric_cost_per_sheet * quantity_per_unit
+
+    # 기초가격 계산
+    base_price = usd_price_per_kg * exchange_rate * (1 + percent_applied / 100)  # 백분율을 소수로 변환
+    return fabric_cost_per_sheet, fabric_cost_total, base_price
+
+def _cost_summary(fabric_cost_total, base_price, submaterials, materials_total, processing_costs, processing_total,
+                  other_costs, other_total, total_cost, margin_rate, margin, corporate_profit, final_price):
+    return {
+        "원단 가격": round(fabric_cost_total, 2),
+        "기초가격": round(base_price, 2),
+        **submaterials,
+        "-- 원부자재 소계": round(materials_total, 2),
+        **processing_costs,
+        "-- 임가공비 소계": round(processing_total, 2),
+        **other_costs,
+        "-- 기타 비용 소계": round(other_total, 2),
+        "총원가": round(total_cost, 2),
+        "마진({}%)".format(int(margin_rate * 100)): round(margin, 2),
+        # 배치 계산(float 배열)과 같은 형식
+        "기업이윤": float(corporate_profit),
+        "제안가(판매가)": round(final_price, 2)
+    }
+
+def calculate_wetwipe_cost(width_mm, height_mm, gsm, exchange_rate, percent_applied, quantity_per_unit, margin_rate=0.10,
+                             labor_cost=None, insurance_cost=None, management_cost=None, interest_cost=None, storage_cost=None, logistics_cost=None, usd_price_per_kg=DEFAULT_USD_PRICE_PER_KG,
+                             submaterials=None, processing_costs=None, other_costs=None, corporate_profit=100):
+    # labor_cost 등 임가공비 인자는 None 이면 cost_items.toml 의 기본값
+    fabric_cost_per_sheet, fabric_cost_total, base_price = _fabric_costs(
+        width_mm, height_mm, gsm, exchange_rate, percent_applied, quantity_per_unit, usd_price_per_kg
+    )
+    fabric_unit_price_per_sheet = round(fabric_cost_per_sheet, 4)
+
+    # 기본 submaterials 값 설정
+    if submaterials is None:
+        submaterials = dict(DEFAULT_SUBMATERIALS)
+
+    # 기본 processing_costs 값 설정
+    if processing_costs is None:
+        processing_costs = default_processing_costs(
+            logistics_cost=logistics_cost, labor_cost=labor_cost, insurance_cost=insurance_cost,
+            management_cost=management_cost, interest_cost=interest_cost, storage_cost=storage_cost
+        )
+        
+    # 기본 other_costs 값 설정
+    if other_costs is None:
+        other_costs = dict(DEFAULT_OTHER_COSTS)
+
+    materials_total = fabric_cost_total + sum(submaterials.values())
+    processing_total = sum(processing_costs.values())
+    other_total = sum(other_costs.values())
+    total_cost = materials_total + processing_total + other_total
+
+    margin = total_cost * margin_rate
+    final_price = total_cost + margin + corporate_profit
+
+    cost_summary = _cost_summary(
+        fabric_cost_total, base_price, submaterials, materials_total, processing_costs, processing_total,
+        other_costs, other_total, total_cost, margin_rate, margin, corporate_profit, final_price
+    )
+
+    return cost_summary, fabric_unit_price_per_sheet, submaterials, processing_costs, other_costs, final_price, base_price
+
+# 실시간 미리보기용 증분 계산
+# 계산 단계 -> (단계가 읽는 입력값, 단계가 읽는 앞 단계)
+# 입력값이 바뀐 단계와 그 단계에 의존하는 뒤 단계만 다시 계산함
+# (예: 원부자재 하나를 바꾸면 원부자재 소계 -> 총원가 -> 제안가만, 원단/임가공비/기타 비용 소계는 그대로)
+COST_STAGES = {
+    "fabric": (("width_mm", "height_mm", "gsm", "exchange_rate", "percent_applied", "quantity_per_unit", "usd_price_per_kg"), ()),
+    "materials": (("submaterials",), ("fabric",)),
+    "processing": (("processing_costs",), ()),
+    "other": (("other_costs",), ()),
+    "total": ((), ("materials", "processing", "other")),
+    "price": (("margin_rate", "corporate_profit"), ("total",)),
+}
+
+class IncrementalCost:
+    # 직전 입력값과 단계별 중간 결과를 들고 있다가 바뀐 입력에 걸린 단계만 다시 계산
+    # 결과는 같은 입력의 calculate_wetwipe_cost 결과(cost_summary)와 같음
+    def __init__(self):
+        self.inputs = {}
+        self.values = {}
+        self.summary = None
+
+    def update(self, width_mm, height_mm, gsm, exchange_rate, percent_applied, quantity_per_unit, margin_rate,
+               usd_price_per_kg, submaterials, processing_costs, other_costs, corporate_profit):
+        # 반환: (cost_summary, 다시 계산한 단계 목록, 값이 바뀐 결과 항목 목록)
+        inputs = {
+            "width_mm": width_mm, "height_mm": height_mm, "gsm": gsm, "exchange_rate": exchange_rate,
+            "percent_applied": percent_applied, "quantity_per_unit": quantity_per_unit, "margin_rate": margin_rate,
+            "usd_price_per_kg": usd_price_per_kg, "submaterials": dict(submaterials),
+            "processing_costs": dict(processing_costs), "other_costs": dict(other_costs),
+            "corporate_profit": corporate_profit,
+        }
+        changed_inputs = {name for name, value in inputs.items() if name not in self.inputs or self.inputs[name] != value}
+        dirty = []
+        for stage, (stage_inputs, depends) in COST_STAGES.items():
+            if changed_inputs.intersection(stage_inputs) or any(depend in dirty for depend in depends):
+                dirty.append(stage)
+        self.inputs = inputs
+        if not dirty:
+            return self.summary, [], []
+
+        values = self.values
+        if "fabric" in dirty:
+            values["fabric"] = _fabric_costs(
+                width_mm, height_mm, gsm, exchange_rate, percent_applied, quantity_per_unit, usd_price_per_kg
+            )
+        if "materials" in dirty:
+            values["materials"] = values["fabric"][1] + sum(inputs["submaterials"].values())
+        if "processing" in dirty:
+            values["processing"] = sum(inputs["processing_costs"].values())
+        if "other" in dirty:
+            values["other"] = sum(inputs["other_costs"].values())
+        if "total" in dirty:
+            values["total"] = values["materials"] + values["processing"] + values["other"]
+        if "price" in dirty:
+            margin = values["total"] * margin_rate
+            values["price"] = (margin, values["total"] + margin + corporate_profit)
+
+        _, fabric_cost_total, base_price = values["fabric"]
+        margin, final_price = values["price"]
+        previous = self.summary or {}
+        self.summary = _cost_summary(
+            fabric_cost_total, base_price, inputs["submaterials"], values["materials"],
+            inputs["processing_costs"], values["processing"], inputs["other_costs"], values["other"],
+            values["total"], margin_rate, margin, corporate_profit, final_price
+        )
+        changed_items = [name for name, value in self.summary.items() if previous.get(name) != value]
+        return self.summary, dirty, changed_items
+
+def _round_like_python(values, ndigits):
+    # np.round는 x * 10**n 의 부동소수 오차 때문에 .5 경계에서 내장 round()와 결과가 다를 수 있음
+    # 경계 근처 값만 내장 round()로 다시 계산해서 스칼라 함수와 비트 단위로 같은 결과를 보장
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    frac = np.abs(scaled - np.floor(scaled) - 0.5)
+    near_tie = frac <= 1e-7 * np.maximum(1.0, np.abs(scaled))
+    if near_tie.any():
+        idx = np.flatnonzero(near_tie)
+        rounded[idx] = [round(float(v), ndigits) for v in values[idx]]
+    return rounded
+
+def calculate_wetwipe_cost_batch(inputs, submaterials=None, processing_costs=None, other_costs=None):
+    # 여러 규격을 한 번에 계산하는 벡터화 버전
+    # inputs: DataFrame 또는 컬럼명 -> 배열 딕셔너리
+    #   필수 컬럼: width_mm, height_mm, gsm, exchange_rate, percent_applied, quantity_per_unit
+    #   선택 컬럼: margin_rate, labor_cost, ..., usd_price_per_kg, corporate_profit (없거나 빈 값이면 calculate_wetwipe_cost 기본값)
+    # submaterials / processing_costs / other_costs: 항목명 -> 기본 금액, 같은 이름의 컬럼이 있으면 행별 값 사용
+    # 반환: cost_summary 항목을 컬럼으로 갖는 DataFrame (마진 컬럼명은 행마다 마진율이 다를 수 있어 "마진"으로 고정)
+    df = inputs if isinstance(inputs, pd.DataFrame) else pd.DataFrame(inputs)
+    n = len(df)
+    defaults = {
+        name: param.default
+        for name, param in inspect.signature(calculate_wetwipe_cost).parameters.items()
+        if param.default is not inspect.Parameter.empty
+    }
+
+    def column(name, default=None):
+        if default is None:
+            default = defaults.get(name)
+        if name in df:
+            values = df[name].to_numpy(dtype=float)
+            missing = np.isnan(values)
+            return np.where(missing, default, values) if default is not None and missing.any() else values
+        return np.full(n, default, dtype=float)
+
+    width_mm = column("width_mm")
+    height_mm = column("height_mm")
+    gsm = column("gsm")
+    exchange_rate = column("exchange_rate")
+    percent_applied = column("percent_applied")
+    quantity_per_unit = column("quantity_per_unit")
+    margin_rate = column("margin_rate")
+    usd_price_per_kg = column("usd_price_per_kg")
+    corporate_profit = column("corporate_profit")
+
+    # 연산 순서는 calculate_wetwipe_cost와 동일하게 유지 (부동소수 결과 일치)
+    area_m2 = (width_mm / 1000) * (height_mm / 1000)
+    applied_usd_price = usd_price_per_kg * (1 + percent_applied / 100)
+    unit_price_per_g = applied_usd_price * exchange_rate / 1000
+    gsm_price = unit_price_per_g * gsm
+    loss_rate_fabric = 0.05
+    applied_unit_price = gsm_price * (1 + loss_rate_fabric)
+    fabric_cost_per_sheet = area_m2 * applied_unit_price
+    fabric_cost_total = fabric_cost_per_sheet * quantity_per_unit
+    base_price = usd_price_per_kg * exchange_rate * (1 + percent_applied / 100)
+
+    if submaterials is None:
+        submaterials = DEFAULT_SUBMATERIALS
+    if processing_costs is None:
+        processing_costs = {
+            name: column(CATALOGUE.params.get(name, name), default)
+            for name, default in DEFAULT_PROCESSING_COSTS.items()
+        }
+    if other_costs is None:
+        other_costs = DEFAULT_OTHER_COSTS
+
+    def item_columns(items):
+        return {
+            name: value if isinstance(value, np.ndarray) else column(name, value)
+            for name, value in items.items()
+        }
+
+    submaterials = item_columns(submaterials)
+    processing_costs = item_columns(processing_costs)
+    other_costs = item_columns(other_costs)
+
+    # sum(dict.values())와 같은 순서로 누적
+    def running_sum(columns, start):
+        total = start
+        for values in columns.values():
+            total = total + values
+        return total
+
+    zeros = np.zeros(n)
+    materials_total = fabric_cost_total + running_sum(submaterials, zeros)
+    processing_total = running_sum(processing_costs, zeros)
+    other_total = running_sum(other_costs, zeros)
+    total_cost = materials_total + processing_total + other_total
+
+    margin = total_cost * margin_rate
+    final_price = total_cost + margin + corporate_profit
+
+    result = pd.DataFrame({
+        "원단 가격": _round_like_python(fabric_cost_total, 2),
+        "기초가격": _round_like_python(base_price, 2),
+        **submaterials,
+        "-- 원부자재 소계": _round_like_python(materials_total, 2),
+        **processing_costs,
+        "-- 임가공비 소계": _round_like_python(processing_total, 2),
+        **other_costs,
+        "-- 기타 비용 소계": _round_like_python(other_total, 2),
+        "총원가": _round_like_python(total_cost, 2),
+        "마진": _round_like_python(margin, 2),
+        "기업이윤": corporate_profit,
+        "제안가(판매가)": _round_like_python(final_price, 2),
+        "원단 단가(1장당)": _round_like_python(fabric_cost_per_sheet, 4),
+        "마진율": margin_rate
+    }, index=df.index)
+
+    return result
+
+# 민감도 분석 대상 입력값
+SWEEP_VARIABLES = {
+    "exchange_rate": "환율 (₩/$)",
+    "usd_price_per_kg": "원단 가격 ($/kg)",
+    "percent_applied": "관세 포함 비율 (%)",
+    "gsm": "평량 (g/㎡)"
+}
+
+# 민감도 분석 결과에 남길 계산 결과 컬럼
+SWEEP_RESULT_COLUMNS = ["원단 가격", "총원가", "제안가(판매가)"]
+
+def _evaluate_sweep(points, base_inputs, items):
+    # points 에 없는 입력값은 base_inputs 로 채워서 배치 계산, 입력값과 주요 결과만 남긴 표 반환
+    inputs = points.copy()
+    for name, value in base_inputs.items():
+        if name not in inputs:
+            inputs[name] = value
+    results = calculate_wetwipe_cost_batch(inputs, **items)
+    return pd.concat([points, results[SWEEP_RESULT_COLUMNS]], axis=1)
+
+def sweep_wetwipe_cost(base_inputs, axes, **items):
+    # axes: 입력 컬럼명 -> 값 목록, 모든 조합(격자)을 한 번에 계산
+    # items: calculate_wetwipe_cost_batch 의 submaterials / processing_costs / other_costs
+    names = list(axes)
+    mesh = np.meshgrid(*[np.asarray(axes[name], dtype=float) for name in names], indexing="ij")
+    points = pd.DataFrame({name: values.ravel() for name, values in zip(names, mesh)})
+    return _evaluate_sweep(points, base_inputs, items)
+
+def sample_wetwipe_cost(base_inputs, ranges, n_samples=10000, seed=None, **items):
+    # 몬테카를로: ranges 의 (최소, 최대) 구간에서 균등분포로 입력값을 뽑아 계산
+    rng = np.random.default_rng(seed)
+    points = pd.DataFrame({name: rng.uniform(low, high, n_samples) for name, (low, high) in ranges.items()})
+    return _evaluate_sweep(points, base_inputs, items)
+
+def tornado_wetwipe_cost(base_inputs, ranges, **items):
+    # 입력값을 하나씩 최소/최대로 바꿨을 때 제안가 (나머지는 기준값), 변동폭이 큰 순서로 정렬
+    # 반환: (표, 기준 제안가)
+    rows = [dict(base_inputs)]
+    for name, (low, high) in ranges.items():
+        rows.append({**base_inputs, name: low})
+        rows.append({**base_inputs, name: high})
+    prices = calculate_wetwipe_cost_batch(pd.DataFrame(rows), **items)["제안가(판매가)"].to_numpy()
+
+    tornado = pd.DataFrame({
+        "입력값": [SWEEP_VARIABLES.get(name, name) for name in ranges],
+        "최소": [low for low, _ in ranges.values()],
+        "최대": [high for _, high in ranges.values()],
+        "최소일 때 제안가": prices[1::2],
+        "최대일 때 제안가": prices[2::2]
+    })
+    tornado["변동폭"] = (tornado["최대일 때 제안가"] - tornado["최소일 때 제안가"]).abs()
+    return tornado.sort_values("변동폭", ascending=False).reset_index(drop=True), prices[0]
+
+# 목표 제안가 역산(goal seek) 대상 입력값 -> (표시 이름, 기본 탐색 범위, 정수 여부)
+SOLVE_VARIABLES = {
+    "gsm": ("평량 (g/㎡)", (10.0, 200.0), False),
+    "quantity_per_unit": ("수량 (매수)", (1, 1000), True),
+    "width_mm": ("원단 가로길이 (mm)", (50, 500), True),
+    "height_mm": ("원단 세로길이 (mm)", (50, 500), True),
+    "usd_price_per_kg": ("원단 가격 ($/kg)", (0.1, 20.0), False),
+    "exchange_rate": ("환율 (₩/$)", (500.0, 3000.0), False),
+    "percent_applied": ("관세 포함 비율 (%)", (0.0, 100.0), False),
+    "margin_rate": ("마진율", (0.0, 1.0), False),
+    "corporate_profit": ("기업이윤 (원)", (0.0, 10000.0), False),
+}
+
+def _solve_prices(variable, values, base_inputs, items):
+    inputs = pd.DataFrame({name: value for name, value in base_inputs.items() if name != variable}, index=range(len(values)))
+    inputs[variable] = values
+    return calculate_wetwipe_cost_batch(inputs, **items)["제안가(판매가)"].to_numpy()
+
+def solve_wetwipe_cost(base_inputs, variable, targets, bounds=None, tolerance=0.005, max_iterations=60, **items):
+    # 제안가가 targets(스칼라 또는 배열)가 되는 variable 값 (나머지 입력값은 base_inputs, items 는 원가 항목)
+    # 제안가는 입력값 하나에 대해 선형이라 범위 양 끝을 계산해서 바로 구하고(닫힌 해),
+    # 확인 계산에서 허용 오차를 넘는 행만 범위를 반씩 줄여 가며(이분법) 한꺼번에 다시 찾음
+    # 반환: 목표 제안가마다 한 행 (범위 안에서 목표에 닿지 않으면 상태가 "범위 밖"이고 값은 빈 값)
+    label, default_bounds, integer = SOLVE_VARIABLES[variable]
+    low, high = bounds or default_bounds
+    targets = np.atleast_1d(np.asarray(targets, dtype=float))
+    price_low, price_high = _solve_prices(variable, [low, high], base_inputs, items)
+
+    reachable = (targets >= min(price_low, price_high) - tolerance) & (targets <= max(price_low, price_high) + tolerance)
+    values = np.full(len(targets), np.nan)
+    if price_high != price_low:
+        values = np.clip(low + (targets - price_low) * (high - low) / (price_high - price_low), low, high)
+    values[~reachable] = np.nan
+
+    solved = reachable.copy()
+    if reachable.any():
+        prices = _solve_prices(variable, values[reachable], base_inputs, items)
+        retry = np.flatnonzero(reachable)[np.abs(prices - targets[reachable]) > tolerance]
+        # 닫힌 해가 맞지 않는 행 (반올림 경계 등): 제안가가 늘어나는 쪽으로 구간을 좁힘
+        increasing = price_high > price_low
+        lower = np.full(len(retry), float(low))
+        upper = np.full(len(retry), float(high))
+        for _ in range(max_iterations):
+            if not len(retry):
+                break
+            middle = (lower + upper) / 2
+            prices = _solve_prices(variable, middle, base_inputs, items)
+            values[retry] = middle
+            done = np.abs(prices - targets[retry]) <= tolerance
+            below = (prices < targets[retry]) == increasing
+            lower = np.where(below, middle, lower)
+            upper = np.where(below, upper, middle)
+            keep = ~done
+            retry, lower, upper = retry[keep], lower[keep], upper[keep]
+        solved[retry] = False
+
+    result = pd.DataFrame({"목표 제안가": targets, label: values})
+    result["제안가"] = np.nan
+    if reachable.any():
+        result.loc[reachable, "제안가"] = _solve_prices(variable, values[reachable], base_inputs, items)
+
+    if integer:
+        # 정수 입력값은 내림/올림 중 제안가가 목표를 넘지 않는 쪽 (둘 다 넘으면 목표에 가까운 쪽)
+        # 제안가는 소수 둘째 자리로 반올림된 값이라 목표보다 허용 오차 이내로 큰 것은 넘지 않은 것으로 봄
+        floor = np.clip(np.floor(values[reachable]), low, high)
+        ceil = np.clip(np.ceil(values[reachable]), low, high)
+        floor_prices = _solve_prices(variable, floor, base_inputs, items)
+        ceil_prices = _solve_prices(variable, ceil, base_inputs, items)
+        target = targets[reachable]
+        floor_fits = floor_prices <= target + tolerance
+        ceil_fits = ceil_prices <= target + tolerance
+        use_ceil = np.where(
+            floor_fits & ceil_fits, ceil_prices > floor_prices,
+            np.where(floor_fits | ceil_fits, ceil_fits,
+                     np.abs(ceil_prices - target) < np.abs(floor_prices - target))
+        )
+        result[f"{label} 정수"] = np.nan
+        result["정수일 때 제안가"] = np.nan
+        result.loc[reachable, f"{label} 정수"] = np.where(use_ceil, ceil, floor)
+        result.loc[reachable, "정수일 때 제안가"] = np.where(use_ceil, ceil_prices, floor_prices)
+
+    result["상태"] = np.where(solved, "계산됨", np.where(reachable, "오차 초과", "범위 밖"))
+    return result
+
+# 대량 견적 업로드 파일의 한글 컬럼명 -> calculate_wetwipe_cost_batch 입력 컬럼
+# (원부자재/기타 비용 항목은 항목명 그대로 컬럼으로 넣으면 행별 금액으로 사용)
+BULK_COLUMN_ALIASES = {
+    "가로": "width_mm",
+    "세로": "height_mm",
+    "평량": "gsm",
+    "매수": "quantity_per_unit",
+    "환율": "exchange_rate",
+    "관세비율": "percent_applied",
+    "마진율": "margin_rate",
+    "기업이윤": "corporate_profit",
+    "원단 가격($/kg)": "usd_price_per_kg",
+    **CATALOGUE.params
+}
+
+# 업로드한 표를 배치 계산 입력으로 변환 (규격 "150x195" 분리, 빠진 컬럼은 defaults 값)
+def prepare_bulk_inputs(uploaded, defaults):
+    df = uploaded.rename(columns=lambda column: BULK_COLUMN_ALIASES.get(str(column).strip(), str(column).strip()))
+    if "규격" in df and not {"width_mm", "height_mm"} <= set(df.columns):
+        size = df["규격"].astype(str).str.lower().str.split("x", n=1, expand=True).reindex(columns=[0, 1])
+        df["width_mm"] = size[0]
+        df["height_mm"] = size[1]
+    if "width_mm" not in df or "height_mm" not in df:
+        raise ValueError("'규격' 또는 '가로'/'세로' 컬럼이 필요합니다.")
+
+    for column, value in defaults.items():
+        if column not in df:
+            df[column] = value
+    if "견적명" not in df:
+        df["견적명"] = ""
+    df["견적명"] = [
+        str(name) if pd.notna(name) and str(name).strip() else f"대량견적-{i + 1}"
+        for i, name in enumerate(df["견적명"])
+    ]
+
+    numeric_columns = [column for column in df.columns if column not in ("견적명", "규격")]
+    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors="coerce")
+    invalid = df[numeric_columns].isna().any(axis=1)
+    if invalid.any():
+        rows = ", ".join(str(i + 2) for i in df.index[invalid][:10])  # +2는 헤더와 1-based 행 번호 때문
+        raise ValueError(f"숫자가 아니거나 비어 있는 값이 있습니다. (행: {rows})")
+
+    return df.reset_index(drop=True)
+
+# 배치 계산 결과 한 행을 calculate_wetwipe_cost 의 cost_summary 형태로 변환
+def batch_row_summary(row):
+    summary = {}
+    for column, value in row.items():
+        if column in ("원단 단가(1장당)", "마진율"):
+            continue
+        if column == "마진":
+            column = "마진({}%)".format(int(row["마진율"] * 100))
+        summary[column] = value
+    return summary
@@ -0,0 +1,501 @@
+# 견적서 내보내기(PDF/Excel)와 차트 명세
+# Streamlit 없이 불러올 수 있어서 앱과 벤치마크(benchmarks/suite.py)가 함께 사용
+# PDF 는 pdf_report 엔진으로 그림 (reportlab 은 무거워서 PDF 를 처음 만들 때 불러옴)
+import math
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from estimate_store import (
+    ESTIMATE_HEADERS, ESTIMATE_TEXT_FIELDS, LEGACY_ITEM_FIELDS, LEGACY_OTHER_COST_NAME_FIELDS,
+    LEGACY_OTHER_COST_VALUE_FIELDS, CONTENT_HASH_FIELD, ITEM_PRICES_FIELD, OTHER_COSTS_FIELD, SAVED_AT_FIELD,
+    USD_PRICE_FIELD, item_price_fields, item_price_table, other_cost_fields, parse_item_prices, parse_other_costs
+)
+from pdf_report import render_estimates_pdf, write_estimates_pdf
+from wetwipe_cost import (
+    DEFAULT_OTHER_COSTS, DEFAULT_PROCESSING_COSTS, DEFAULT_SUBMATERIALS, DEFAULT_USD_PRICE_PER_KG, SWEEP_VARIABLES,
+    batch_row_summary
+)
+
+# 결과 PDF 생성 (견적마다 새 페이지에 항목/금액 표)
+# results: (제목, cost_summary) 목록, 메모리에서 만드는 PDF 는 조각으로 나누지 않고 reportlab 으로 한 번에 그림
+def build_results_pdf(results):
+    return render_estimates_pdf(results)
+
+def build_result_pdf(result):
+    return build_results_pdf([("물티슈 원가계산 결과", result)])
+
+# 결과 Excel 생성
+def build_result_excel(result):
+    df_result = pd.DataFrame(result.items(), columns=["항목", "금액 (원)"])
+    excel_buffer = BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
+        df_result.to_excel(writer, index=False, sheet_name="견적서")
+        worksheet = writer.sheets["견적서"]
+        worksheet.set_column('A:B', 30)  # 열 너비 조정
+    return excel_buffer.getvalue()
+
+# 대량 견적 업로드 양식 컬럼
+BULK_TEMPLATE_COLUMNS = ["견적명", "규격", "평량", "매수", "환율", "관세비율", "마진율", "기업이윤", "원단 가격($/kg)"]
+
+# 업로드 파일 읽기 (한글 Excel 에서 저장한 CSV 는 cp949 일 수 있음)
+def read_bulk_upload(uploaded_file):
+    data = uploaded_file.getvalue()
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        return pd.read_excel(BytesIO(data))
+    try:
+        return pd.read_csv(BytesIO(data), encoding="utf-8-sig")
+    except UnicodeDecodeError:
+        return pd.read_csv(BytesIO(data), encoding="cp949")
+
+# 배치 계산 결과를 견적 로그 행으로 변환
+def bulk_estimate_records(inputs, results):
+    other_cost_names = list(DEFAULT_OTHER_COSTS)
+    item_names = [*DEFAULT_SUBMATERIALS, *DEFAULT_PROCESSING_COSTS]
+    records = pd.DataFrame({
+        "견적명": inputs["견적명"],
+        "규격": [f"{w:g}x{h:g}" for w, h in zip(inputs["width_mm"], inputs["height_mm"])],
+        "평량": inputs["gsm"],
+        "매수": inputs["quantity_per_unit"],
+        "환율": inputs["exchange_rate"],
+        "관세비율": inputs["percent_applied"],
+        "제안가": results["제안가(판매가)"],
+        # 배치 계산과 같이 빈 값은 기본 원단 가격
+        USD_PRICE_FIELD: (
+            pd.to_numeric(inputs["usd_price_per_kg"], errors="coerce").fillna(DEFAULT_USD_PRICE_PER_KG)
+            if "usd_price_per_kg" in inputs else DEFAULT_USD_PRICE_PER_KG
+        ),
+        **{header: results[header] for header in ESTIMATE_HEADERS
+           if header in results.columns and header not in LEGACY_ITEM_FIELDS},
+        "마진율": results["마진율"]
+    }).to_dict("records")
+    for record, item_prices, other_costs in zip(
+        records, results[item_names].to_dict("records"), results[other_cost_names].to_dict("records")
+    ):
+        record.update(item_price_fields(item_prices))
+        record.update(other_cost_fields(other_costs))
+    return records
+
+# 대량 견적 Excel (요약/상세 내역/입력값 시트)
+def build_bulk_excel(inputs, results):
+    summary = pd.DataFrame({
+        "견적명": inputs["견적명"],
+        "규격": [f"{w:g}x{h:g}" for w, h in zip(inputs["width_mm"], inputs["height_mm"])],
+        "평량": inputs["gsm"],
+        "매수": inputs["quantity_per_unit"],
+        "총원가": results["총원가"],
+        "제안가(판매가)": results["제안가(판매가)"]
+    })
+    details = pd.concat([inputs[["견적명"]], results], axis=1)
+
+    excel_buffer = BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
+        summary.to_excel(writer, index=False, sheet_name="견적 요약")
+        writer.sheets["견적 요약"].set_column(0, len(summary.columns) - 1, 16)
+        details.to_excel(writer, index=False, sheet_name="상세 내역")
+        writer.sheets["상세 내역"].set_column(0, len(details.columns) - 1, 14)
+        inputs.to_excel(writer, index=False, sheet_name="입력값")
+    return excel_buffer.getvalue()
+
+# 대량 견적 PDF의 (제목, cost_summary) 목록 (필요한 만큼만 만듦)
+def bulk_pdf_estimates(inputs, results):
+    for name, row in zip(inputs["견적명"], results.to_dict("records")):
+        yield str(name), batch_row_summary(row)
+
+# 대량 견적 PDF (견적마다 새 페이지)
+def build_bulk_pdf(inputs, results):
+    return build_results_pdf(bulk_pdf_estimates(inputs, results))
+
+# 대량 견적 PDF를 파일에 바로 씀 (견적이 많으면 조각씩 그려서 이어 씀, 전체 문서를 메모리에 두지 않음)
+def write_bulk_pdf(inputs, results, path):
+    return write_estimates_pdf(bulk_pdf_estimates(inputs, results), path)
+
+# 견적 이력 Excel 의 견적 이력 시트 컬럼
+# (기타 비용은 합계만, 전체 항목별 금액은 따로 시트로, 내역 JSON 과 내용 해시는 뺌)
+HISTORY_EXCEL_COLUMNS = ["번호"] + [
+    header for header in ESTIMATE_HEADERS
+    if header not in (OTHER_COSTS_FIELD, CONTENT_HASH_FIELD, ITEM_PRICES_FIELD,
+                      *LEGACY_OTHER_COST_NAME_FIELDS, *LEGACY_OTHER_COST_VALUE_FIELDS)
+] + ["기타 비용 합계"]
+
+def _is_blank(value):
+    return value is None or value == "" or (isinstance(value, float) and math.isnan(value))
+
+def _finite_number(value):
+    # 숫자로 쓸 수 있는 값이면 float, 아니면 None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+# 견적 이력 Excel (요약/견적 이력/항목별 금액 시트)
+# rows: 견적 로그 행(컬럼명 -> 값) 반복자, xlsxwriter 의 constant_memory 모드로 한 행씩 파일에 바로 씀
+# 견적명 같은 텍스트는 write_string 으로 써서 "=1+1" 이나 주소 형태의 값이 수식/링크가 되지 않게 함
+# 반환: 쓴 견적 수
+def write_estimate_history_excel(rows, path):
+    import xlsxwriter
+    from xlsxwriter.utility import xl_col_to_name
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    header_format = workbook.add_format({"bold": True, "bg_color": "#333333", "font_color": "#FFFFFF", "border": 1})
+    money_format = workbook.add_format({"num_format": "#,##0.00"})
+    ratio_format = workbook.add_format({"num_format": "0.0%"})
+    count_format = workbook.add_format({"num_format": "#,##0"})
+    bold_format = workbook.add_format({"bold": True})
+
+    # 시트 순서대로 만들고, 요약은 행을 모두 읽은 뒤에 채움
+    summary_sheet = workbook.add_worksheet("요약")
+    history_sheet = workbook.add_worksheet("견적 이력")
+    items_sheet = workbook.add_worksheet("항목별 금액")
+
+    history_columns = HISTORY_EXCEL_COLUMNS + ["제안가/총원가"]
+    column_index = {column: i for i, column in enumerate(history_columns)}
+    column_letter = {column: xl_col_to_name(i) for column, i in column_index.items()}
+    column_formats = {}
+    for column in history_columns:
+        if column == "마진율" or column == "제안가/총원가":
+            column_formats[column] = ratio_format
+        elif column not in ESTIMATE_TEXT_FIELDS and column != "번호":
+            column_formats[column] = money_format
+    history_sheet.write_row(0, 0, history_columns, header_format)
+    history_sheet.freeze_panes(1, 2)
+    history_sheet.set_column(0, 0, 6)
+    history_sheet.set_column(1, len(history_columns) - 1, 14)
+
+    items_columns = ["번호", "견적명", SAVED_AT_FIELD, "구분", "항목", "금액 (원)"]
+    items_sheet.write_row(0, 0, items_columns, header_format)
+    items_sheet.freeze_panes(1, 0)
+    items_sheet.set_column(0, len(items_columns) - 1, 16)
+    item_groups = [("원부자재", list(DEFAULT_SUBMATERIALS)), ("임가공비", list(DEFAULT_PROCESSING_COSTS))]
+
+    # 요약 시트 수식의 결과 캐시 값 (총원가/제안가 전체 통계, 월별 집계)
+    # [개수, 합계] 와 [개수, 합계, 최저, 최고] (행을 모아 두지 않고 누적)
+    total_stats = [0, 0.0]
+    price_stats = [0, 0.0, math.inf, -math.inf]
+    months = {}
+    count = 0
+    item_row = 1
+    for count, row in enumerate(rows, start=1):
+        item_prices = parse_item_prices(row)
+        other_costs = parse_other_costs(row)
+        values = {**row, "번호": count, "기타 비용 합계": sum(other_costs.values())}
+        numbers = {}
+        for column in HISTORY_EXCEL_COLUMNS:
+            value = values.get(column)
+            if _is_blank(value):
+                continue
+            number = None if column in ESTIMATE_TEXT_FIELDS else _finite_number(value)
+            if number is None:
+                history_sheet.write_string(count, column_index[column], str(value), column_formats.get(column))
+            else:
+                history_sheet.write_number(count, column_index[column], number, column_formats.get(column))
+                numbers[column] = number
+        total_cell = f"{column_letter['총원가']}{count + 1}"
+        price_cell = f"{column_letter['제안가']}{count + 1}"
+        history_sheet.write_formula(
+            count, column_index["제안가/총원가"], f'=IFERROR({price_cell}/{total_cell},"")', ratio_format,
+            numbers["제안가"] / numbers["총원가"] if "제안가" in numbers and numbers.get("총원가") else ""
+        )
+
+        for group, names in [*item_groups, ("기타 비용", list(other_costs))]:
+            for name in names:
+                amount = other_costs[name] if group == "기타 비용" else item_prices.get(name)
+                if _is_blank(amount):
+                    continue
+                items_sheet.write_number(item_row, 0, count)
+                for col, text in enumerate([row.get("견적명", ""), row.get(SAVED_AT_FIELD, ""), group, name], start=1):
+                    items_sheet.write_string(item_row, col, "" if _is_blank(text) else str(text))
+                items_sheet.write_number(item_row, 5, float(amount), money_format)
+                item_row += 1
+
+        if "총원가" in numbers:
+            total_stats[0] += 1
+            total_stats[1] += numbers["총원가"]
+        month = str(row.get(SAVED_AT_FIELD) or "")[:7]
+        stats = months.setdefault(month, [0, 0.0, 0])
+        stats[0] += 1
+        if "제안가" in numbers:
+            price = numbers["제안가"]
+            price_stats[0] += 1
+            price_stats[1] += price
+            price_stats[2] = min(price_stats[2], price)
+            price_stats[3] = max(price_stats[3], price)
+            stats[1] += price
+            stats[2] += 1
+    if count:
+        history_sheet.autofilter(0, 0, count, len(history_columns) - 1)
+    items_sheet.autofilter(0, 0, max(item_row - 1, 1), len(items_columns) - 1)
+
+    # 요약: 전체 통계와 월별 견적 수/평균 제안가 (견적 이력 시트를 참조하는 수식)
+    def history_range(column):
+        letter = column_letter[column]
+        return f"'견적 이력'!${letter}$2:${letter}${max(count, 1) + 1}"
+
+    summary_sheet.set_column(0, 0, 18)
+    summary_sheet.set_column(1, 2, 16)
+    summary_sheet.write_row(0, 0, ["항목", "값"], header_format)
+    summary_sheet.write(1, 0, "견적 수", bold_format)
+    summary_sheet.write_formula(1, 1, f"=COUNT({history_range('번호')})", count_format, count)
+    for i, (label, function, column, cached) in enumerate([
+        ("평균 총원가", "AVERAGE", "총원가", total_stats[1] / total_stats[0] if total_stats[0] else ""),
+        ("평균 제안가", "AVERAGE", "제안가", price_stats[1] / price_stats[0] if price_stats[0] else ""),
+        # 빈 범위의 MIN/MAX 는 엑셀에서 0
+        ("최저 제안가", "MIN", "제안가", price_stats[2] if price_stats[0] else 0),
+        ("최고 제안가", "MAX", "제안가", price_stats[3] if price_stats[0] else 0),
+    ], start=2):
+        summary_sheet.write(i, 0, label, bold_format)
+        summary_sheet.write_formula(i, 1, f"=IFERROR({function}({history_range(column)}),\"\")", money_format, cached)
+
+    summary_sheet.write_row(7, 0, ["저장 월", "견적 수", "평균 제안가"], header_format)
+    for i, month in enumerate(sorted(months), start=8):
+        month_count, price_sum, price_count = months[month]
+        pattern = f'"{month}*"' if month else '""'
+        summary_sheet.write_string(i, 0, month or "(저장일 없음)")
+        summary_sheet.write_formula(i, 1, f"=COUNTIF({history_range(SAVED_AT_FIELD)},{pattern})", count_format, month_count)
+        summary_sheet.write_formula(
+            i, 2, f'=IFERROR(AVERAGEIF({history_range(SAVED_AT_FIELD)},{pattern},{history_range("제안가")}),"")',
+            money_format, price_sum / price_count if price_count else ""
+        )
+
+    workbook.close()
+    return count
+
+# 견적 비교용 금액 구성 (견적 로그 표의 여러 견적을 한 번에, 행 = 견적, 컬럼 = 항목)
+# 소계는 저장된 항목 금액으로 다시 합산하고, 마진은 제안가에서 나머지를 뺀 값이라 항목을 모두 더하면 제안가와 같음
+COMPARE_GROUPS = ["원단 가격", "원부자재", "임가공비", "기타 비용", "마진", "기업이윤"]
+
+def estimate_cost_breakdown(table):
+    def numeric(name):
+        if name not in table:
+            return pd.Series(0.0, index=table.index)
+        return pd.to_numeric(table[name], errors="coerce").fillna(0.0)
+
+    submaterials = item_price_table(table, DEFAULT_SUBMATERIALS).fillna(0.0)
+    processing_costs = item_price_table(table, DEFAULT_PROCESSING_COSTS).fillna(0.0)
+    other_cost_columns = [
+        column for column in (OTHER_COSTS_FIELD, *LEGACY_OTHER_COST_NAME_FIELDS, *LEGACY_OTHER_COST_VALUE_FIELDS)
+        if column in table
+    ]
+    other_total = pd.Series([
+        sum(parse_other_costs(row).values()) for row in table[other_cost_columns].to_dict("records")
+    ], index=table.index, dtype=float)
+
+    fabric = numeric("원단 가격")
+    materials_total = fabric + submaterials.sum(axis=1)
+    processing_total = processing_costs.sum(axis=1)
+    total_cost = materials_total + processing_total + other_total
+    price = numeric("제안가")
+    corporate_profit = numeric("기업이윤")
+    return pd.concat([
+        fabric.rename("원단 가격"),
+        submaterials,
+        materials_total.rename("원부자재 소계"),
+        processing_costs,
+        processing_total.rename("임가공비 소계"),
+        other_total.rename("기타 비용"),
+        total_cost.rename("총원가"),
+        (price - total_cost - corporate_profit).rename("마진"),
+        corporate_profit.rename("기업이윤"),
+        price.rename("제안가"),
+    ], axis=1)
+
+def compare_estimates(breakdown, base):
+    # 기준 견적(base, 인덱스) 대비 견적별 항목 금액 차이와 제안가 차이율
+    differences = breakdown - breakdown.loc[base]
+    base_price = breakdown.at[base, "제안가"]
+    differences["제안가 차이율(%)"] = (differences["제안가"] / base_price * 100).round(2) if base_price else np.nan
+    return differences.round(2)
+
+# 차트는 Vega-Lite 명세(dict)로 만들어서 브라우저에서 그림 (서버에서 matplotlib figure 를 만들지 않음)
+# st.vega_lite_chart(spec) 로 표시
+
+# 파이 차트 (항목별 비중)
+def pie_chart_spec(values):
+    return {
+        "data": {"values": [{"item": item, "cost": float(cost)} for item, cost in values.items()]},
+        "transform": [
+            {"joinaggregate": [{"op": "sum", "field": "cost", "as": "total"}]},
+            {"calculate": "datum.total ? datum.cost / datum.total : 0", "as": "share"}
+        ],
+        "encoding": {
+            "theta": {"field": "cost", "type": "quantitative", "stack": True},
+            "color": {"field": "item", "type": "nominal", "title": "항목", "sort": None},
+            "tooltip": [
+                {"field": "item", "title": "항목"},
+                {"field": "cost", "title": "비용 (원)", "format": ",.2f"},
+                {"field": "share", "title": "비율", "format": ".1%"}
+            ]
+        },
+        "layer": [
+            {"mark": {"type": "arc", "outerRadius": 120}},
+            {"mark": {"type": "text", "radius": 145}, "encoding": {"text": {"field": "share", "format": ".1%"}}}
+        ],
+        "view": {"stroke": None}
+    }
+
+# 가로 막대 차트 (큰 항목이 위로)
+def bar_chart_spec(values, title, color):
+    return {
+        "title": title,
+        "data": {"values": [{"item": item, "cost": float(cost)} for item, cost in values.items()]},
+        "encoding": {
+            "y": {"field": "item", "type": "nominal", "sort": "-x", "title": None},
+            "x": {"field": "cost", "type": "quantitative", "title": "비용 (원)"},
+            "tooltip": [{"field": "item", "title": "항목"}, {"field": "cost", "title": "비용 (원)", "format": ",.2f"}]
+        },
+        "layer": [
+            {"mark": {"type": "bar", "color": color}},
+            {"mark": {"type": "text", "align": "left", "dx": 3},
+             "encoding": {"text": {"field": "cost", "format": ",.2f"}}}
+        ]
+    }
+
+# 원가 구성 차트 (전체, 원부자재, 임가공비)
+def cost_chart_specs(result, submaterials, processing_costs):
+    total_costs = {
+        "원단": result["원단 가격"],
+        "원부자재": sum(submaterials.values()),
+        "임가공비": sum(processing_costs.values())
+    }
+    return {
+        "total": pie_chart_spec(total_costs),
+        "submaterials": bar_chart_spec(submaterials, "원부자재 항목별 비용", "skyblue"),
+        "processing": bar_chart_spec(processing_costs, "임가공비 항목별 비용", "lightgreen")
+    }
+
+# 민감도 분석 히트맵 (두 입력값 격자에 대한 결과값)
+def sweep_heatmap_spec(sweep, x, y, value="제안가(판매가)"):
+    data = sweep[[x, y, value]].rename(columns={x: "x", y: "y", value: "value"})
+    return {
+        "title": f"{value} 민감도",
+        "data": {"values": data.to_dict("records")},
+        "mark": {"type": "rect"},
+        "encoding": {
+            "x": {"field": "x", "type": "ordinal", "title": SWEEP_VARIABLES.get(x, x),
+                  "axis": {"format": ".4~g", "labelOverlap": True}},
+            "y": {"field": "y", "type": "ordinal", "title": SWEEP_VARIABLES.get(y, y), "sort": "descending",
+                  "axis": {"format": ".4~g", "labelOverlap": True}},
+            "color": {"field": "value", "type": "quantitative", "title": f"{value} (원)",
+                      "scale": {"scheme": "viridis"}},
+            "tooltip": [
+                {"field": "x", "title": SWEEP_VARIABLES.get(x, x), "format": ",.4~g"},
+                {"field": "y", "title": SWEEP_VARIABLES.get(y, y), "format": ",.4~g"},
+                {"field": "value", "title": value, "format": ",.2f"}
+            ]
+        }
+    }
+
+# 토네이도 차트 (기준 제안가 대비 입력값별 변동)
+def tornado_chart_spec(tornado, base_price):
+    rows = [
+        {"input": row["입력값"], "case": case, "price": float(row[f"{case}일 때 제안가"]), "base": float(base_price)}
+        for _, row in tornado.iterrows()
+        for case in ("최소", "최대")
+    ]
+    return {
+        "title": f"입력값별 제안가 변동 (기준 {base_price:,.2f} 원)",
+        "layer": [
+            {
+                "data": {"values": rows},
+                "mark": {"type": "bar"},
+                "encoding": {
+                    "y": {"field": "input", "type": "nominal", "sort": None, "title": None},
+                    "x": {"field": "price", "type": "quantitative", "title": "제안가(판매가) (원)",
+                          "scale": {"zero": False}},
+                    "x2": {"field": "base"},
+                    "color": {"field": "case", "type": "nominal", "title": None,
+                              "scale": {"domain": ["최소", "최대"], "range": ["skyblue", "salmon"]}},
+                    "tooltip": [
+                        {"field": "input", "title": "입력값"},
+                        {"field": "case", "title": "경우"},
+                        {"field": "price", "title": "제안가 (원)", "format": ",.2f"}
+                    ]
+                }
+            },
+            {
+                "data": {"values": [{"base": float(base_price)}]},
+                "mark": {"type": "rule", "color": "gray"},
+                "encoding": {"x": {"field": "base", "type": "quantitative"}}
+            }
+        ]
+    }
+
+# 몬테카를로 결과 분포 (구간별 빈도를 서버에서 집계해서 표본 전체를 보내지 않음)
+def price_histogram_spec(samples, value="제안가(판매가)", bins=50):
+    counts, edges = np.histogram(samples[value], bins=bins)
+    quantiles = samples[value].quantile([0.05, 0.5, 0.95])
+    return {
+        "title": f"{value} 분포 ({len(samples):,}회)",
+        "layer": [
+            {
+                "data": {"values": [
+                    {"start": float(edges[i]), "end": float(edges[i + 1]), "count": int(counts[i])}
+                    for i in range(len(counts))
+                ]},
+                "mark": {"type": "bar", "color": "skyblue"},
+                "encoding": {
+                    "x": {"field": "start", "type": "quantitative", "title": f"{value} (원)", "scale": {"zero": False}},
+                    "x2": {"field": "end"},
+                    "y": {"field": "count", "type": "quantitative", "title": "빈도"},
+                    "tooltip": [
+                        {"field": "start", "title": "부터", "format": ",.2f"},
+                        {"field": "end", "title": "까지", "format": ",.2f"},
+                        {"field": "count", "title": "빈도"}
+                    ]
+                }
+            },
+            {
+                "data": {"values": [{"quantile": f"{int(q * 100)}%", "price": float(v)} for q, v in quantiles.items()]},
+                "mark": {"type": "rule", "color": "gray", "strokeDash": [4, 4]},
+                "encoding": {
+                    "x": {"field": "price", "type": "quantitative"},
+                    "tooltip": [{"field": "quantile", "title": "분위"}, {"field": "price", "title": "제안가 (원)", "format": ",.2f"}]
+                }
+            }
+        ]
+    }
+
+def _compare_groups(row):
+    # estimate_cost_breakdown 한 행을 COMPARE_GROUPS 금액으로 (합계 = 제안가)
+    return {
+        "원단 가격": row["원단 가격"],
+        "원부자재": row["원부자재 소계"] - row["원단 가격"],
+        "임가공비": row["임가공비 소계"],
+        "기타 비용": row["기타 비용"],
+        "마진": row["마진"],
+        "기업이윤": row["기업이윤"],
+    }
+
+# 두 견적의 제안가 차이를 항목 그룹별로 쌓아 올린 폭포 차트 (기준 제안가 -> 그룹별 증감 -> 비교 제안가)
+def quote_waterfall_spec(breakdown, base, target, base_label, target_label):
+    base_row = breakdown.loc[base]
+    target_row = breakdown.loc[target]
+    base_groups = _compare_groups(base_row)
+    target_groups = _compare_groups(target_row)
+
+    rows = [{"step": base_label, "start": 0.0, "end": float(base_row["제안가"]), "amount": float(base_row["제안가"]), "kind": "제안가"}]
+    level = float(base_row["제안가"])
+    for group in COMPARE_GROUPS:
+        delta = float(target_groups[group] - base_groups[group])
+        rows.append({"step": group, "start": level, "end": level + delta, "amount": delta,
+                     "kind": "증가" if delta >= 0 else "감소"})
+        level += delta
+    rows.append({"step": target_label, "start": 0.0, "end": float(target_row["제안가"]), "amount": float(target_row["제안가"]), "kind": "제안가"})
+    return {
+        "title": f"제안가 차이 {float(target_row['제안가'] - base_row['제안가']):+,.2f} 원",
+        "data": {"values": rows},
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "step", "type": "nominal", "sort": None, "title": None, "axis": {"labelAngle": 0}},
+            "y": {"field": "start", "type": "quantitative", "title": "금액 (원)"},
+            "y2": {"field": "end"},
+            "color": {"field": "kind", "type": "nominal", "title": None,
+                      "scale": {"domain": ["제안가", "증가", "감소"], "range": ["steelblue", "salmon", "lightgreen"]}},
+            "tooltip": [
+                {"field": "step", "title": "항목"},
+                {"field": "amount", "title": "금액 (원)", "format": "+,.2f"}
+            ]
+        }
+    }